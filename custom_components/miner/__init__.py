@@ -1,25 +1,52 @@
 """The Miner integration."""
 from __future__ import annotations
 
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING
 
-try:
-    import pyasic
-except ImportError:
-    from .patch import install_package
-    from .const import PYASIC_VERSION
-
-    install_package(f"pyasic=={PYASIC_VERSION}")
-    import pyasic
-
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.config_entries import SOURCE_SYSTEM
+from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
 from homeassistant.const import Platform
+from homeassistant.core import callback
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryError
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
+from homeassistant.helpers.typing import ConfigType
 
+from .admission import get_setup_admission
+from .admission import PRIORITY_KNOWN
+from .admission import PRIORITY_NEW
+from .admission import SETUP_TIMEOUT
+from .aggregate import get_fleet_aggregator
+from .bootstrap import async_import_pyasic
+from .bootstrap import ensure_pyasic
+from .const import CONF_FLEET
 from .const import CONF_IP
+from .const import CONF_MAX_CONCURRENT
+from .const import DATA_FLEET
+from .const import DEFAULT_FLEET_MAX_CONCURRENT
+from .const import DEFAULT_SCAN_INTERVAL
 from .const import DOMAIN
-from .coordinator import MinerCoordinator
-from .services import async_setup_services
+from .const import FLEET_UNIQUE_ID
+from .const import PYASIC_VERSION
+from .fleet import FleetScheduler
+from .identity import async_get_identity_cache
+from .identity import entities_changed
+from .identity import miner_identity
+from .identity import MinerIdentityCache
+
+if TYPE_CHECKING:
+    from .coordinator import MinerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [
     Platform.SENSOR,
@@ -27,35 +54,263 @@ PLATFORMS: list[Platform] = [
     Platform.NUMBER,
     Platform.SELECT,
 ]
+FLEET_PLATFORMS: list[Platform] = [Platform.SENSOR]
+
+FLEET_SCHEMA = vol.Schema(
+    {
+        vol.Optional(
+            CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_MAX_CONCURRENT, default=DEFAULT_FLEET_MAX_CONCURRENT
+        ): cv.positive_int,
+    }
+)
+
+CONFIG_SCHEMA = vol.Schema(
+    {DOMAIN: vol.Schema({vol.Optional(CONF_FLEET): FLEET_SCHEMA})},
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Miner integration."""
+    fleet_config = config.get(DOMAIN, {}).get(CONF_FLEET)
+    if fleet_config is not None:
+        fleet = FleetScheduler(
+            hass,
+            interval=timedelta(seconds=fleet_config[CONF_SCAN_INTERVAL]),
+            max_concurrent=fleet_config[CONF_MAX_CONCURRENT],
+        )
+        hass.data[DATA_FLEET] = fleet
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, fleet.async_stop)
+
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
-    """Set up Miner from a config entry."""
+    """Set up Miner from a config entry.
 
-    miner_ip = config_entry.data[CONF_IP]
-    miner = await pyasic.get_miner(miner_ip)
+    If the identity of the miner is cached from an earlier start, the entities
+    are created from the cache right away and the miner is detected in the
+    background.  Otherwise the miner is detected once here and handed to the
+    coordinator, the platforms share the result of the first refresh.
+    """
+    if config_entry.unique_id == FLEET_UNIQUE_ID:
+        # Only holds the fleet device, the miners are counted by their entries
+        await hass.config_entries.async_forward_entry_setups(
+            config_entry, FLEET_PLATFORMS
+        )
+        return True
 
-    if miner is None:
-        raise ConfigEntryNotReady("Miner could not be found.")
+    start = time.monotonic()
 
-    m_coordinator = MinerCoordinator(hass, config_entry)
-    hass.data.setdefault(DOMAIN, {})[config_entry.entry_id] = m_coordinator
+    # pyasic and the modules using it are only imported once an entry exists
+    if not await hass.async_add_executor_job(ensure_pyasic):
+        raise ConfigEntryError(
+            f"pyasic {PYASIC_VERSION} is not installed and installing it failed, "
+            "see the log for the pip error."
+        )
+    try:
+        pyasic = await async_import_pyasic(hass)
+    except ImportError as err:
+        raise ConfigEntryError(str(err)) from err
+    from .coordinator import MinerCoordinator
+    from .services import async_setup_services
+    from .transport import MinerTransport
+    from .transport import async_register_transport
 
-    await m_coordinator.async_config_entry_first_refresh()
+    transport = MinerTransport(config_entry.data[CONF_IP])
+    config_entry.async_on_unload(async_register_transport(transport))
+
+    identity_cache = await async_get_identity_cache(hass)
+    cached_identity = identity_cache.get(config_entry.entry_id)
+    if cached_identity is not None and cached_identity.get("mac") is None:
+        # Written by an offline first refresh, detect the miner instead
+        cached_identity = None
+
+    if cached_identity is None:
+        miner_ip = config_entry.data[CONF_IP]
+        try:
+            # Only the time with a slot counts, not the wait for one
+            async with (
+                get_setup_admission(hass).slot(PRIORITY_NEW),
+                asyncio.timeout(SETUP_TIMEOUT),
+            ):
+                miner = await pyasic.get_miner(miner_ip)
+                detected = time.monotonic()
+
+                if miner is None:
+                    raise ConfigEntryNotReady("Miner could not be found.")
+
+                m_coordinator = MinerCoordinator(
+                    hass, config_entry, miner=miner, transport=transport
+                )
+                await m_coordinator.async_config_entry_first_refresh()
+        except TimeoutError as err:
+            raise ConfigEntryNotReady(
+                f"Miner did not answer within {SETUP_TIMEOUT}s of setup."
+            ) from err
+
+        hass.data.setdefault(DOMAIN, {})[config_entry.entry_id] = m_coordinator
+        # An offline first refresh has no identity worth creating entities from
+        if m_coordinator.data.mac is not None:
+            identity_cache.async_set(
+                config_entry.entry_id, miner_identity(miner, m_coordinator.data)
+            )
+    else:
+        detected = time.monotonic()
+        m_coordinator = MinerCoordinator(hass, config_entry, transport=transport)
+        m_coordinator.async_set_cached_identity(cached_identity)
+        hass.data.setdefault(DOMAIN, {})[config_entry.entry_id] = m_coordinator
+    refreshed = time.monotonic()
+
+    if (fleet := hass.data.get(DATA_FLEET)) is not None:
+        config_entry.async_on_unload(fleet.async_register(m_coordinator))
+
+    config_entry.async_on_unload(
+        get_fleet_aggregator(hass).async_register(m_coordinator)
+    )
+
+    config_entry.async_on_unload(config_entry.add_update_listener(async_reload_entry))
 
     await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
+    if (
+        hass.config_entries.async_entry_for_domain_unique_id(DOMAIN, FLEET_UNIQUE_ID)
+        is None
+    ):
+        hass.async_create_task(
+            hass.config_entries.flow.async_init(
+                DOMAIN, context={"source": SOURCE_SYSTEM}
+            )
+        )
+
+    # Only fetch the data of enabled entities from now on
+    m_coordinator.async_update_data_options()
+    config_entry.async_on_unload(
+        hass.bus.async_listen(
+            EVENT_ENTITY_REGISTRY_UPDATED,
+            m_coordinator.async_update_data_options,
+            event_filter=m_coordinator.entity_enabled_changed,
+        )
+    )
 
     await async_setup_services(hass)
 
+    if cached_identity is not None:
+        _async_validate_cached_identity(
+            hass, config_entry, m_coordinator, identity_cache, cached_identity
+        )
+
+    done = time.monotonic()
+    m_coordinator.setup_times = {
+        "detect": round(detected - start, 3),
+        "first_refresh": round(refreshed - detected, 3),
+        "platforms": round(done - refreshed, 3),
+        "total": round(done - start, 3),
+        "cached": cached_identity is not None,
+    }
+    _LOGGER.debug(
+        "Setup of %s took %.2fs (detect %.2fs, first refresh %.2fs, platforms %.2fs%s).",
+        config_entry.title,
+        done - start,
+        detected - start,
+        refreshed - detected,
+        done - refreshed,
+        ", from cache" if cached_identity is not None else "",
+    )
+
     return True
 
 
+@callback
+def _async_validate_cached_identity(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    coordinator: MinerCoordinator,
+    identity_cache: MinerIdentityCache,
+    cached_identity: dict,
+) -> None:
+    """Check the cached identity once the miner answers for the first time.
+
+    The entry is reloaded if the entities created from the cache no longer
+    match the miner, e.g. after a firmware update.
+    """
+
+    @callback
+    def _async_check() -> None:
+        nonlocal unsub
+        if unsub is None:
+            return
+        if coordinator.miner is None or coordinator.data.mac is None:
+            return
+        unsub()
+        unsub = None
+        identity = miner_identity(coordinator.miner, coordinator.data)
+        identity_cache.async_set(config_entry.entry_id, identity)
+        if entities_changed(cached_identity, identity):
+            _LOGGER.info(
+                "%s: miner changed since the last start, reloading.",
+                config_entry.title,
+            )
+            hass.config_entries.async_schedule_reload(config_entry.entry_id)
+
+    @callback
+    def _async_stop() -> None:
+        if unsub is not None:
+            unsub()
+
+    unsub = coordinator.async_add_listener(_async_check)
+    config_entry.async_on_unload(_async_stop)
+
+    async def _async_first_refresh() -> None:
+        async with get_setup_admission(hass).slot(PRIORITY_KNOWN):
+            await coordinator.async_admitted_refresh()
+
+    config_entry.async_create_background_task(
+        hass, _async_first_refresh(), f"{DOMAIN} first refresh"
+    )
+
+
+async def async_reload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Reload a config entry when its options change."""
+    await hass.config_entries.async_reload(config_entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Unload a config entry."""
+    if config_entry.unique_id == FLEET_UNIQUE_ID:
+        return await hass.config_entries.async_unload_platforms(
+            config_entry, FLEET_PLATFORMS
+        )
+
     unload_ok = await hass.config_entries.async_unload_platforms(
         config_entry, PLATFORMS
     )
     if unload_ok:
-        hass.data[DOMAIN].pop(config_entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(config_entry.entry_id)
+        await coordinator.commands.async_shutdown()
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Forget the cached identity of a removed config entry.
+
+    The fleet entry is removed together with the last miner.
+    """
+    if config_entry.unique_id == FLEET_UNIQUE_ID:
+        return
+    identity_cache = await async_get_identity_cache(hass)
+    identity_cache.async_remove(config_entry.entry_id)
+
+    entries = hass.config_entries.async_entries(DOMAIN)
+    if all(
+        entry.unique_id == FLEET_UNIQUE_ID or entry.entry_id == config_entry.entry_id
+        for entry in entries
+    ):
+        for entry in entries:
+            if entry.unique_id == FLEET_UNIQUE_ID:
+                hass.async_create_task(
+                    hass.config_entries.async_remove(entry.entry_id)
+                )
@@ -0,0 +1,81 @@
+"""Admission of miner setups through a bounded, prioritized pool."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_ADMISSION
+
+# Miners that answered at the last start are set up before new ones
+PRIORITY_KNOWN = 0
+PRIORITY_NEW = 1
+
+# Miners contacted at the same time while entries are set up
+DEFAULT_SETUP_MAX_CONCURRENT = 20
+# Seconds an admitted entry without cached identity may take to detect its miner
+SETUP_TIMEOUT = 60
+
+
+class SetupAdmission:
+    """Let a limited number of miner setups talk to their miners at once.
+
+    When Home Assistant starts every entry is set up at the same moment.
+    Waiting setups are admitted by priority, then in the order they arrived.
+    """
+
+    def __init__(self, max_concurrent: int = DEFAULT_SETUP_MAX_CONCURRENT) -> None:
+        """Initialize the pool."""
+        self.max_concurrent = max_concurrent
+        self._free = max_concurrent
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self.admitted = 0
+        self.peak_waiting = 0
+
+    @property
+    def waiting(self) -> int:
+        """Return the number of setups waiting for a slot."""
+        return sum(not future.done() for _, _, future in self._waiters)
+
+    @asynccontextmanager
+    async def slot(self, priority: int) -> AsyncIterator[None]:
+        """Wait for a free slot, lower priorities are admitted first."""
+        if self._free and not self._waiters:
+            self._free -= 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._order), future))
+            self.peak_waiting = max(self.peak_waiting, len(self._waiters))
+            try:
+                await future
+            except asyncio.CancelledError:
+                # Pass on a slot that was granted just before the cancellation
+                if future.done() and not future.cancelled():
+                    self._release()
+                raise
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        """Hand the slot to the next waiting setup or free it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._free += 1
+
+
+def get_setup_admission(hass: HomeAssistant) -> SetupAdmission:
+    """Return the admission pool shared by all entries."""
+    if (admission := hass.data.get(DATA_ADMISSION)) is None:
+        admission = hass.data[DATA_ADMISSION] = SetupAdmission()
+    return admission
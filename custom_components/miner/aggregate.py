@@ -0,0 +1,191 @@
+"""Fleet wide totals of all Miner coordinators."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+from homeassistant.core import CALLBACK_TYPE
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_call_later
+
+from .const import DATA_AGGREGATE
+
+if TYPE_CHECKING:
+    from .coordinator import MinerCoordinator
+
+# Seconds to collect miner updates into one update of the fleet entities
+FLEET_UPDATE_DELAY = 1
+
+
+@dataclass(slots=True, frozen=True)
+class MinerContribution:
+    """Values of one miner counted in the fleet totals."""
+
+    hashrate: float
+    consumption: float
+    mining: bool
+    chip_temperature: float | None
+
+
+def miner_contribution(coordinator: MinerCoordinator) -> MinerContribution | None:
+    """Return what a miner adds to the fleet totals, None while it is offline."""
+    data = coordinator.data
+    if data is None or not coordinator.last_update_success:
+        return None
+    if not coordinator.available:
+        return None
+    chip_temperatures = [
+        board.chip_temperature
+        for board in data.board_sensors.values()
+        if board.chip_temperature is not None
+    ]
+    return MinerContribution(
+        hashrate=data.miner_sensors.hashrate or 0,
+        consumption=data.miner_sensors.miner_consumption or 0,
+        mining=bool(data.is_mining),
+        chip_temperature=max(chip_temperatures, default=None),
+    )
+
+
+class FleetAggregator:
+    """Running totals over all miners, updated from the change of one miner.
+
+    Every coordinator update subtracts the previous contribution of the miner
+    and adds the new one, so an update costs the same for any fleet size.
+    Only the maximum chip temperature is searched again, when the hottest
+    miner cools down or goes offline.  The fleet entities belong to the fleet
+    config entry, which has no miner of its own.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the aggregator."""
+        self.hass = hass
+        self._coordinators: dict[str, MinerCoordinator] = {}
+        self._contributions: dict[str, MinerContribution] = {}
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._unsub_update: CALLBACK_TYPE | None = None
+
+        self.total_hashrate = 0.0
+        self.total_consumption = 0.0
+        self.miners_online = 0
+        self.miners_mining = 0
+        self.max_chip_temperature: float | None = None
+
+    @property
+    def miners(self) -> int:
+        """Return the number of miners set up."""
+        return len(self._coordinators)
+
+    @property
+    def efficiency(self) -> float | None:
+        """Return the energy per hash of the whole fleet in J/TH."""
+        if not self.total_hashrate or not self.total_consumption:
+            return None
+        return self.total_consumption / self.total_hashrate
+
+    @callback
+    def async_register(self, coordinator: MinerCoordinator) -> CALLBACK_TYPE:
+        """Count a coordinator in the totals until the returned callback."""
+        entry_id = coordinator.config_entry.entry_id
+        self._coordinators[entry_id] = coordinator
+        self._async_apply(entry_id, miner_contribution(coordinator))
+        self._async_schedule_update()
+        unsub = coordinator.async_add_listener(
+            partial(self._async_coordinator_updated, entry_id)
+        )
+
+        @callback
+        def _async_unregister() -> None:
+            unsub()
+            self._coordinators.pop(entry_id, None)
+            self._async_apply(entry_id, None)
+            self._async_schedule_update()
+
+        return _async_unregister
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call ``update_callback`` when the totals have changed."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def _async_remove() -> None:
+            self._listeners.remove(update_callback)
+
+        return _async_remove
+
+    @callback
+    def _async_coordinator_updated(self, entry_id: str) -> None:
+        """Update the totals with the new data of a miner."""
+        if (coordinator := self._coordinators.get(entry_id)) is not None:
+            self._async_apply(entry_id, miner_contribution(coordinator))
+
+    @callback
+    def _async_apply(self, entry_id: str, new: MinerContribution | None) -> None:
+        """Replace the contribution of a miner in the totals."""
+        old = self._contributions.get(entry_id)
+        if old == new:
+            return
+        if new is None:
+            del self._contributions[entry_id]
+        else:
+            self._contributions[entry_id] = new
+
+        if old is not None:
+            self.total_hashrate -= old.hashrate
+            self.total_consumption -= old.consumption
+            self.miners_online -= 1
+            self.miners_mining -= old.mining
+        if new is not None:
+            self.total_hashrate += new.hashrate
+            self.total_consumption += new.consumption
+            self.miners_online += 1
+            self.miners_mining += new.mining
+
+        new_temperature = new.chip_temperature if new is not None else None
+        old_temperature = old.chip_temperature if old is not None else None
+        if new_temperature is not None and (
+            self.max_chip_temperature is None
+            or new_temperature >= self.max_chip_temperature
+        ):
+            self.max_chip_temperature = new_temperature
+        elif (
+            old_temperature is not None and old_temperature == self.max_chip_temperature
+        ):
+            self.max_chip_temperature = max(
+                (
+                    contribution.chip_temperature
+                    for contribution in self._contributions.values()
+                    if contribution.chip_temperature is not None
+                ),
+                default=None,
+            )
+        self._async_schedule_update()
+
+    @callback
+    def _async_schedule_update(self) -> None:
+        """Update the fleet entities shortly, once for many miner updates."""
+        if self._unsub_update is None:
+            self._unsub_update = async_call_later(
+                self.hass, FLEET_UPDATE_DELAY, self._async_update_listeners
+            )
+
+    @callback
+    def _async_update_listeners(self, _now=None) -> None:
+        """Update the fleet entities."""
+        self._unsub_update = None
+        if not self._contributions:
+            # Keep the sums exact once no miner is left to count
+            self.total_hashrate = self.total_consumption = 0.0
+        for update_callback in list(self._listeners):
+            update_callback()
+
+
+@callback
+def get_fleet_aggregator(hass: HomeAssistant) -> FleetAggregator:
+    """Return the aggregator shared by all entries."""
+    if (aggregator := hass.data.get(DATA_AGGREGATE)) is None:
+        aggregator = hass.data[DATA_AGGREGATE] = FleetAggregator(hass)
+    return aggregator
@@ -0,0 +1,68 @@
+"""Run control commands on many miners at once."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Any
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pyasic
+
+    from .coordinator import MinerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+MinerAction = Callable[["MinerCoordinator", "pyasic.AnyMiner"], Awaitable[Any]]
+
+
+async def async_run_batch(
+    targets: list[tuple[str, MinerCoordinator]],
+    action: MinerAction,
+    max_concurrent: int,
+    timeout: float,
+) -> list[dict]:
+    """Run an action on every target miner and return a result per device.
+
+    At most ``max_concurrent`` miners are contacted at the same time and each
+    action is cancelled after ``timeout`` seconds.  The cached miner of the
+    coordinator is used, it is only detected if the coordinator has none yet.
+    A failing miner does not affect the others.
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def _run(device_id: str, coordinator: MinerCoordinator) -> dict:
+        result = {
+            "device_id": device_id,
+            "name": coordinator.config_entry.title,
+            "success": False,
+            "error": None,
+        }
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                async with asyncio.timeout(timeout):
+                    miner = coordinator.miner or await coordinator.get_miner()
+                    if miner is None:
+                        raise ConnectionError("Miner could not be found")
+                    await action(coordinator, miner)
+            except TimeoutError:
+                result["error"] = f"Timed out after {timeout}s"
+            except Exception as err:  # one bad miner must not fail the batch
+                result["error"] = str(err) or type(err).__name__
+            else:
+                result["success"] = True
+            result["duration"] = round(time.monotonic() - start, 3)
+
+        if result["error"] is not None:
+            _LOGGER.warning("%s: %s", coordinator.config_entry.title, result["error"])
+        return result
+
+    return list(
+        await asyncio.gather(
+            *(_run(device_id, coordinator) for device_id, coordinator in targets)
+        )
+    )
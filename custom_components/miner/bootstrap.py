@@ -0,0 +1,107 @@
+"""Make sure the pinned pyasic version is installed.
+
+``ensure_pyasic`` checks the installed pyasic version once per process and
+installs the pinned version if needed.  Setup runs it in an executor, so the
+install never blocks the event loop, and importing this module does nothing.
+
+Modules using pyasic get it from ``import_pyasic`` instead of importing it
+themselves, so they never depend on the order of their imports.  Setup imports
+it lazily with ``async_import_pyasic``, so loading the integration without any
+config entries does not pay for it.
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+import sys
+import threading
+import time
+from importlib.metadata import PackageNotFoundError
+from importlib.metadata import version
+from types import ModuleType
+
+from homeassistant.core import HomeAssistant
+
+from .const import PYASIC_VERSION
+from .patch import install_package
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds to wait for the pyasic install before giving up
+INSTALL_TIMEOUT = 300
+
+_lock = threading.Lock()
+_ready: bool | None = None
+
+
+def _installed_version() -> str | None:
+    """Return the installed pyasic version."""
+    try:
+        return version("pyasic")
+    except PackageNotFoundError:
+        return None
+
+
+def ensure_pyasic() -> bool:
+    """Install the pinned pyasic version if needed, return if it is available.
+
+    The result is cached, so only the first call checks or installs anything.
+    """
+    global _ready
+
+    with _lock:
+        if _ready is not None:
+            return _ready
+
+        start = time.perf_counter()
+        installed = _installed_version()
+        _LOGGER.debug(
+            "pyasic version check took %.3fs (installed %s, required %s).",
+            time.perf_counter() - start,
+            installed,
+            PYASIC_VERSION,
+        )
+
+        if installed != PYASIC_VERSION:
+            start = time.perf_counter()
+            if not install_package(
+                f"pyasic=={PYASIC_VERSION}", install_timeout=INSTALL_TIMEOUT
+            ):
+                _LOGGER.error(
+                    "Installing pyasic %s failed after %.1fs.",
+                    PYASIC_VERSION,
+                    time.perf_counter() - start,
+                )
+                _ready = False
+                return _ready
+            _LOGGER.info(
+                "Installed pyasic %s in %.1fs.",
+                PYASIC_VERSION,
+                time.perf_counter() - start,
+            )
+            importlib.invalidate_caches()
+
+        _ready = True
+        return _ready
+
+
+def import_pyasic() -> ModuleType:
+    """Import pyasic once the pinned version is installed, blocking."""
+    if not ensure_pyasic():
+        raise ImportError(
+            f"pyasic {PYASIC_VERSION} is not installed and installing it failed, "
+            "see the log for the pip error."
+        )
+    if (module := sys.modules.get("pyasic")) is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module("pyasic")
+    _LOGGER.debug("Importing pyasic took %.3fs.", time.perf_counter() - start)
+    return module
+
+
+async def async_import_pyasic(hass: HomeAssistant) -> ModuleType:
+    """Import pyasic in the import executor if it is not loaded yet."""
+    if _ready and (module := sys.modules.get("pyasic")) is not None:
+        return module
+    return await hass.async_add_import_executor_job(import_pyasic)
@@ -0,0 +1,113 @@
+"""Serialized commands to a single miner."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+COMMAND_POWER_LIMIT = "power_limit"
+COMMAND_MINING_MODE = "mining_mode"
+COMMAND_MINING = "mining"
+COMMAND_REBOOT = "reboot"
+COMMAND_RESTART_BACKEND = "restart_backend"
+
+Command = Callable[[], Awaitable[Any]]
+
+
+class MinerCommandQueue:
+    """Send commands to a miner one at a time.
+
+    Commands are queued under a key and run in order.  A command queued while
+    another one with the same key is still waiting replaces it, both callers
+    get the result of the newer command.  Every caller waits on a future of
+    its own, so one that gives up does not cancel the command of the others.
+    Polls take ``lock`` as well, so they never run at the same time as a
+    command.  Once the queue is empty ``on_drained`` is awaited, e.g. to
+    confirm the changes with one refresh.  ``async_shutdown`` stops the
+    worker when the config entry is unloaded.
+    """
+
+    def __init__(self, on_drained: Callable[[], Awaitable[None]]) -> None:
+        """Initialize the queue."""
+        self.lock = asyncio.Lock()
+        self._on_drained = on_drained
+        self._pending: dict[str, tuple[Command, list[asyncio.Future]]] = {}
+        self._running: str | None = None
+        self._worker: asyncio.Task | None = None
+        self.executed = 0
+        self.merged = 0
+
+    @property
+    def busy(self) -> bool:
+        """Return if a command is running or waiting."""
+        return self._running is not None or bool(self._pending)
+
+    async def async_run(self, key: str, command: Command) -> Any:
+        """Queue a command and return its result once it has run."""
+        future = asyncio.get_running_loop().create_future()
+        futures = [future]
+        if (pending := self._pending.get(key)) is not None:
+            futures = [*(f for f in pending[1] if not f.done()), future]
+            self.merged += 1
+            _LOGGER.debug("Replacing the pending %s command.", key)
+        self._pending[key] = (command, futures)
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._async_work())
+        return await future
+
+    async def async_join(self) -> None:
+        """Wait until all queued commands and the drain callback have run."""
+        if self._worker is not None and not self._worker.done():
+            await asyncio.shield(self._worker)
+
+    async def async_shutdown(self) -> None:
+        """Stop the worker, the callers of unfinished commands are cancelled."""
+        for _, futures in self._pending.values():
+            for future in futures:
+                future.cancel()
+        self._pending.clear()
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+        self._worker = None
+
+    async def _async_work(self) -> None:
+        """Run the queued commands, then the drain callback."""
+        while self._pending:
+            while self._pending:
+                key = next(iter(self._pending))
+                command, futures = self._pending.pop(key)
+                if all(future.done() for future in futures):
+                    # every caller gave up waiting before the command started
+                    continue
+                self._running = key
+                try:
+                    async with self.lock:
+                        result = await command()
+                except asyncio.CancelledError:
+                    for future in futures:
+                        future.cancel()
+                    raise
+                except Exception as err:  # raised to the callers instead
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(err)
+                else:
+                    for future in futures:
+                        if not future.done():
+                            future.set_result(result)
+                    self.executed += 1
+                finally:
+                    self._running = None
+
+            try:
+                await self._on_drained()
+            except Exception:  # the commands themselves have already finished
+                _LOGGER.exception("Error after running miner commands")
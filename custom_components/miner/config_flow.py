@@ -1,58 +1,61 @@
 """Config flow for Miner."""
-import logging
-from importlib.metadata import version
-
-from .const import PYASIC_VERSION
-
-try:
-    import pyasic
+from __future__ import annotations
 
-    if not version("pyasic") == PYASIC_VERSION:
-        raise ImportError
-except ImportError:
-    from .patch import install_package
-
-    install_package(f"pyasic=={PYASIC_VERSION}")
-    import pyasic
-
-from pyasic import MinerNetwork
-from pyasic.device.makes import MinerMake
+import logging
+from contextlib import aclosing
+from typing import TYPE_CHECKING
 
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.components import network
+from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.core import callback
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.config_entry_flow import register_discovery_flow
 from homeassistant.helpers.selector import TextSelector
 from homeassistant.helpers.selector import TextSelectorConfig
 from homeassistant.helpers.selector import TextSelectorType
 
+from .bootstrap import async_import_pyasic
+from .const import CONF_CONFIG_INTERVAL
+from .const import CONF_FAN_DEADBAND
+from .const import CONF_IDENTITY_INTERVAL
 from .const import CONF_IP
-from .const import CONF_MIN_POWER
+from .const import CONF_MAX_INTERVAL
 from .const import CONF_MAX_POWER
+from .const import CONF_MIN_INTERVAL
+from .const import CONF_MIN_POWER
+from .const import CONF_PERF_STATS
 from .const import CONF_RPC_PASSWORD
 from .const import CONF_SSH_PASSWORD
 from .const import CONF_SSH_USERNAME
+from .const import CONF_TEMPERATURE_DEADBAND
 from .const import CONF_TITLE
 from .const import CONF_WEB_PASSWORD
 from .const import CONF_WEB_USERNAME
+from .const import DEFAULT_CONFIG_INTERVAL
+from .const import DEFAULT_FAN_DEADBAND
+from .const import DEFAULT_IDENTITY_INTERVAL
+from .const import DEFAULT_MAX_INTERVAL
+from .const import DEFAULT_MIN_INTERVAL
+from .const import DEFAULT_PERF_STATS
+from .const import DEFAULT_SCAN_INTERVAL
+from .const import DEFAULT_TEMPERATURE_DEADBAND
 from .const import DOMAIN
+from .const import FLEET_NAME
+from .const import FLEET_UNIQUE_ID
+from .discovery import async_discover_miners
+
+if TYPE_CHECKING:
+    import pyasic
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def _async_has_devices(hass: HomeAssistant) -> bool:
     """Return if there are devices that can be discovered."""
-    adapters = await network.async_get_adapters(hass)
-
-    for adapter in adapters:
-        for ip_info in adapter["ipv4"]:
-            local_ip = ip_info["address"]
-            network_prefix = ip_info["network_prefix"]
-            miner_net = MinerNetwork.from_subnet(f"{local_ip}/{network_prefix}")
-            miners = await miner_net.scan()
-            if len(miners) > 0:
-                return True
+    async with aclosing(async_discover_miners(hass)) as miners:
+        async for _ in miners:
+            return True
     return False
 
 
@@ -60,11 +63,12 @@ register_discovery_flow(DOMAIN, "miner", _async_has_devices)
 
 
 async def validate_ip_input(
-    data: dict[str, str]
+    hass: HomeAssistant, data: dict[str, str]
 ) -> tuple[dict[str, str], pyasic.AnyMiner | None]:
     """Validate the user input allows us to connect."""
     miner_ip = data.get(CONF_IP)
 
+    pyasic = await async_import_pyasic(hass)
     miner = await pyasic.get_miner(miner_ip)
     if miner is None:
         return {"base": "Unable to connect to Miner, is IP correct?"}, None
@@ -82,6 +86,28 @@ class MinerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._data = {}
         self._miner = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return MinerOptionsFlow()
+
+    @classmethod
+    @callback
+    def async_supports_options_flow(
+        cls, config_entry: config_entries.ConfigEntry
+    ) -> bool:
+        """Return if the entry has options, the fleet entry has none."""
+        return config_entry.unique_id != FLEET_UNIQUE_ID
+
+    async def async_step_system(self, user_input=None):
+        """Create the entry of the fleet device."""
+        await self.async_set_unique_id(FLEET_UNIQUE_ID)
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=FLEET_NAME, data={})
+
     async def async_step_user(self, user_input=None):
         """Get miner IP and check if it is available."""
         if user_input is None:
@@ -102,7 +128,7 @@ class MinerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if not user_input:
             return self.async_show_form(step_id="user", data_schema=schema)
 
-        errors, miner = await validate_ip_input(user_input)
+        errors, miner = await validate_ip_input(self.hass, user_input)
 
         if errors:
             return self.async_show_form(
@@ -118,6 +144,8 @@ class MinerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is None:
             user_input = {}
 
+        from pyasic.device.makes import MinerMake
+
         # Detect BitAxe miners and skip credential prompts
         if self._miner.make == MinerMake.BITAXE:
             return await self.async_step_title()
@@ -226,3 +254,55 @@ class MinerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._data.update(user_input)
 
         return self.async_create_entry(title=self._data[CONF_TITLE], data=self._data)
+
+
+class MinerOptionsFlow(config_entries.OptionsFlow):
+    """Handle Miner options."""
+
+    async def async_step_init(self, user_input=None):
+        """Manage the polling options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+        schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_SCAN_INTERVAL,
+                    default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                vol.Optional(
+                    CONF_CONFIG_INTERVAL,
+                    default=options.get(CONF_CONFIG_INTERVAL, DEFAULT_CONFIG_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+                vol.Optional(
+                    CONF_IDENTITY_INTERVAL,
+                    default=options.get(
+                        CONF_IDENTITY_INTERVAL, DEFAULT_IDENTITY_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100000)),
+                vol.Optional(
+                    CONF_MIN_INTERVAL,
+                    default=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                vol.Optional(
+                    CONF_MAX_INTERVAL,
+                    default=options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                vol.Optional(
+                    CONF_FAN_DEADBAND,
+                    default=options.get(CONF_FAN_DEADBAND, DEFAULT_FAN_DEADBAND),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=10000)),
+                vol.Optional(
+                    CONF_TEMPERATURE_DEADBAND,
+                    default=options.get(
+                        CONF_TEMPERATURE_DEADBAND, DEFAULT_TEMPERATURE_DEADBAND
+                    ),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
+                vol.Optional(
+                    CONF_PERF_STATS,
+                    default=options.get(CONF_PERF_STATS, DEFAULT_PERF_STATS),
+                ): bool,
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema)
@@ -11,10 +11,51 @@ CONF_WEB_PASSWORD = "web_password"
 CONF_WEB_USERNAME = "web_username"
 CONF_MIN_POWER = "min_power"
 CONF_MAX_POWER = "max_power"
+CONF_CONFIG_INTERVAL = "config_interval"
+CONF_IDENTITY_INTERVAL = "identity_interval"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_MAX_INTERVAL = "max_interval"
+CONF_FAN_DEADBAND = "fan_deadband"
+CONF_TEMPERATURE_DEADBAND = "temperature_deadband"
+CONF_FLEET = "fleet"
+CONF_MAX_CONCURRENT = "max_concurrent"
+CONF_PERF_STATS = "perf_stats"
+
+DATA_FLEET = f"{DOMAIN}_fleet"
+DATA_IDENTITY = f"{DOMAIN}_identity"
+DATA_AGGREGATE = f"{DOMAIN}_aggregate"
+DATA_ADMISSION = f"{DOMAIN}_admission"
+
+# Config entry holding the fleet device, created with the first miner
+FLEET_UNIQUE_ID = "fleet"
+FLEET_NAME = "Miner fleet"
+
+DEFAULT_SCAN_INTERVAL = 10
+# Bounds of the adaptive poll interval, in seconds
+DEFAULT_MIN_INTERVAL = 5
+DEFAULT_MAX_INTERVAL = 60
+# Sensor changes smaller than the deadband are not written, 0 disables it
+DEFAULT_FAN_DEADBAND = 0
+DEFAULT_TEMPERATURE_DEADBAND = 0
+# Intervals of the slow polling tiers, in polling cycles
+DEFAULT_CONFIG_INTERVAL = 6
+# Also picks up firmware updates that did not interrupt the polls
+DEFAULT_IDENTITY_INTERVAL = 60
+DEFAULT_FLEET_MAX_CONCURRENT = 20
+DEFAULT_PERF_STATS = False
+# Control services contact at most this many miners at once
+DEFAULT_BATCH_MAX_CONCURRENT = 20
+DEFAULT_BATCH_TIMEOUT = 30
+# Fleet curtailment changes this many miners per wave, waves are spaced apart
+DEFAULT_CURTAIL_WAVE_SIZE = 20
+DEFAULT_CURTAIL_WAVE_INTERVAL = 10
 
 SERVICE_REBOOT = "reboot"
 SERVICE_RESTART_BACKEND = "restart_backend"
 SERVICE_SET_WORK_MODE = "set_work_mode"
+SERVICE_GET_PERF_STATS = "get_perf_stats"
+SERVICE_CURTAIL_FLEET = "curtail_fleet"
+SERVICE_GET_HISTORY = "get_history"
 
 TERA_HASH_PER_SECOND = "TH/s"
 JOULES_PER_TERA_HASH = "J/TH"
@@ -1,79 +1,324 @@
 """Miner DataUpdateCoordinator."""
+import asyncio
+import contextlib
 import logging
+import random
+import time
+from collections.abc import Callable
+from dataclasses import replace
 from datetime import timedelta
-from importlib.metadata import version
-
-from .const import PYASIC_VERSION
-
-try:
-    import pyasic
-
-    if not version("pyasic") == PYASIC_VERSION:
-        raise ImportError
-except ImportError:
-    from .patch import install_package
-
-    install_package(f"pyasic=={PYASIC_VERSION}")
-    import pyasic
+from enum import StrEnum
+from typing import Any
 
+import httpx
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.const import Platform
+from homeassistant.core import callback
+from homeassistant.core import Event
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.debounce import Debouncer
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.helpers.update_coordinator import UpdateFailed
 
+from .bootstrap import import_pyasic
+from .commands import MinerCommandQueue
+from .const import CONF_CONFIG_INTERVAL
+from .const import CONF_FAN_DEADBAND
+from .const import CONF_IDENTITY_INTERVAL
 from .const import CONF_IP
-from .const import CONF_MIN_POWER
+from .const import CONF_MAX_INTERVAL
 from .const import CONF_MAX_POWER
+from .const import CONF_MIN_INTERVAL
+from .const import CONF_MIN_POWER
+from .const import CONF_PERF_STATS
 from .const import CONF_RPC_PASSWORD
 from .const import CONF_SSH_PASSWORD
 from .const import CONF_SSH_USERNAME
+from .const import CONF_TEMPERATURE_DEADBAND
 from .const import CONF_WEB_PASSWORD
 from .const import CONF_WEB_USERNAME
+from .const import DEFAULT_CONFIG_INTERVAL
+from .const import DEFAULT_FAN_DEADBAND
+from .const import DEFAULT_IDENTITY_INTERVAL
+from .const import DEFAULT_MAX_INTERVAL
+from .const import DEFAULT_MIN_INTERVAL
+from .const import DEFAULT_PERF_STATS
+from .const import DEFAULT_SCAN_INTERVAL
+from .const import DEFAULT_TEMPERATURE_DEADBAND
+from .const import DOMAIN
+from .history import MinerHistory
+from .identity import IDENTITY_KEYS
+from .identity import miner_capabilities
+from .perf import PerfStats
+from .perf import PHASE_DETECT
+from .perf import PHASE_ENTITIES
+from .perf import PHASE_FETCH
+from .perf import PHASE_TRANSFORM
+from .perf import PHASE_UPDATE
+from .snapshot import BoardSensors
+from .snapshot import DEVICE_DATA_KEYS
+from .snapshot import FanSensors
+from .snapshot import MinerSensors
+from .snapshot import MinerSnapshot
+from .snapshot import PowerLimitRange
+from .snapshot import snapshot_values
+from .transport import MinerTransport
+from .transport import token_expired
+
+pyasic = import_pyasic()
 
 _LOGGER = logging.getLogger(__name__)
 
 # Matches iotwatt data log interval
 REQUEST_REFRESH_DEFAULT_COOLDOWN = 5
 
-DEFAULT_DATA = {
-    "hostname": None,
-    "mac": None,
-    "make": None,
-    "model": None,
-    "ip": None,
-    "is_mining": False,
-    "fw_ver": None,
-    "miner_sensors": {
-        "hashrate": 0,
-        "ideal_hashrate": 0,
-        "active_preset_name": None,
-        "temperature": 0,
-        "power_limit": 0,
-        "miner_consumption": 0,
-        "efficiency": 0.0,
-    },
-    "board_sensors": {},
-    "fan_sensors": {},
-    "config": {},
+# Weight of the newest sample in the latency moving average
+LATENCY_EWMA_ALPHA = 0.3
+# Never poll a miner faster than this multiple of its average latency
+LATENCY_INTERVAL_FACTOR = 2
+# Number of polls at the minimum interval after a control action
+CONTROL_BOOST_POLLS = 3
+
+# Consecutive failures before the circuit breaker stops polling a miner
+BREAKER_FAILURE_THRESHOLD = 3
+# Backoff of an open circuit breaker, in seconds
+BREAKER_BASE_BACKOFF = 30
+BREAKER_MAX_BACKOFF = 600
+# Ports tried by the half-open probe: RPC and web API
+PROBE_PORTS = (4028, 80)
+PROBE_TIMEOUT = 2
+# Errors of a miner that could not be reached, the detected miner is kept
+TRANSIENT_ERRORS = (TimeoutError, OSError, httpx.TransportError)
+
+# Telemetry that changes between polls, fetched every cycle
+TELEMETRY_DATA_OPTIONS = [
+    pyasic.DataOptions.IS_MINING,
+    pyasic.DataOptions.HASHRATE,
+    pyasic.DataOptions.EXPECTED_HASHRATE,
+    pyasic.DataOptions.HASHBOARDS,
+    pyasic.DataOptions.WATTAGE,
+    pyasic.DataOptions.WATTAGE_LIMIT,
+    pyasic.DataOptions.FANS,
+]
+CONFIG_DATA_OPTIONS = [
+    pyasic.DataOptions.CONFIG,
+]
+IDENTITY_DATA_OPTIONS = [
+    pyasic.DataOptions.HOSTNAME,
+    pyasic.DataOptions.MAC,
+    pyasic.DataOptions.FW_VERSION,
+]
+# Always fetched, the availability check, history and fleet totals use them
+CORE_DATA_OPTIONS = {
+    pyasic.DataOptions.IS_MINING,
+    pyasic.DataOptions.HASHRATE,
+    pyasic.DataOptions.WATTAGE,
+}
+# Data only fetched while an entity showing it is enabled, by unique id suffix
+ENTITY_DATA_OPTIONS = {
+    "temperature": pyasic.DataOptions.HASHBOARDS,
+    "board_temperature": pyasic.DataOptions.HASHBOARDS,
+    "chip_temperature": pyasic.DataOptions.HASHBOARDS,
+    "board_hashrate": pyasic.DataOptions.HASHBOARDS,
+    "peak_temperature": pyasic.DataOptions.HASHBOARDS,
+    "ideal_hashrate": pyasic.DataOptions.EXPECTED_HASHRATE,
+    "power_limit": pyasic.DataOptions.WATTAGE_LIMIT,
+    "fan_speed": pyasic.DataOptions.FANS,
+    "active_preset_name": pyasic.DataOptions.CONFIG,
+    "power-mode": pyasic.DataOptions.CONFIG,
+}
+# Entities that are only created for miners with the capability
+ENTITY_CAPABILITIES = {
+    "active_preset_name": "supports_autotuning",
+    "power-mode": "supports_power_modes",
 }
+FLEET_TEMPERATURE_UNIQUE_ID = "fleet-max_chip_temperature"
+
+
+class AdaptivePollInterval:
+    """Derive the poll interval of a miner from its latency and state."""
+
+    def __init__(self, base: float, minimum: float, maximum: float) -> None:
+        """Initialize the adaptive poll interval."""
+        self.base = base
+        self.minimum = min(minimum, base)
+        self.maximum = max(maximum, base)
+        self.latency: float | None = None
+        self._boost_polls = 0
+
+    def record_latency(self, seconds: float) -> None:
+        """Add a get_data latency sample to the moving average."""
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency = (
+                LATENCY_EWMA_ALPHA * seconds + (1 - LATENCY_EWMA_ALPHA) * self.latency
+            )
 
+    def boost(self) -> None:
+        """Poll at the minimum interval for the next few polls."""
+        self._boost_polls = CONTROL_BOOST_POLLS
+
+    def next_interval(self, is_mining: bool | None, failures: int) -> float:
+        """Return the number of seconds until the next poll."""
+        if self._boost_polls > 0:
+            self._boost_polls -= 1
+            interval = self.minimum
+        elif failures > 0:
+            interval = self.base * 2 ** min(failures, 10)
+        elif is_mining is False:
+            interval = self.maximum
+        else:
+            interval = self.base
+        interval = min(max(interval, self.minimum), self.maximum)
+
+        if self.latency is not None:
+            interval = max(interval, self.latency * LATENCY_INTERVAL_FACTOR)
+        return interval
+
+
+class CircuitState(StrEnum):
+    """State of a miner circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class MinerCircuitBreaker:
+    """Stop polling a miner that keeps failing until it answers a probe."""
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        base_backoff: float = BREAKER_BASE_BACKOFF,
+        max_backoff: float = BREAKER_MAX_BACKOFF,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self._retry_at = 0.0
 
-class MinerCoordinator(DataUpdateCoordinator):
+    @property
+    def retry_in(self) -> float:
+        """Return the number of seconds until the next probe is allowed."""
+        if self.state is not CircuitState.OPEN:
+            return 0
+        return max(self._retry_at - time.monotonic(), 0)
+
+    def allow_request(self) -> bool:
+        """Return if the miner may be contacted."""
+        if self.state is CircuitState.OPEN:
+            if time.monotonic() < self._retry_at:
+                return False
+            self.state = CircuitState.HALF_OPEN
+        return True
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful poll."""
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.trips = 0
+
+    def record_failure(self) -> None:
+        """Count a failed poll, opening the circuit when needed."""
+        self.failures += 1
+        if (
+            self.state is CircuitState.HALF_OPEN
+            or self.failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        """Open the circuit with an exponential, jittered backoff."""
+        self.state = CircuitState.OPEN
+        self.trips += 1
+        backoff = min(
+            self.base_backoff * 2 ** min(self.trips - 1, 16), self.max_backoff
+        )
+        self._retry_at = time.monotonic() + random.uniform(backoff / 2, backoff)
+
+
+class MinerCoordinator(DataUpdateCoordinator[MinerSnapshot]):
     """Class to manage fetching update data from the Miner."""
 
     miner: pyasic.AnyMiner = None
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
-        """Initialize MinerCoordinator object."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        miner: pyasic.AnyMiner | None = None,
+        transport: MinerTransport | None = None,
+    ) -> None:
+        """Initialize MinerCoordinator object.
+
+        A miner detected during setup can be passed in, so the first refresh
+        does not need to detect it again.  ``transport`` is the connection
+        pool its web commands are sent through.
+        """
         self.miner = None
+        self._miner_stale = True
         self._failure_count = 0
+        self.miner_cache_hits = 0
+        self.miner_detections = 0
+        self._cycle = 0
+        self._identity: dict | None = None
+        self._identity_stale = True
+        self._config: pyasic.MinerConfig | None = None
+        self._config_time: float | None = None
+        self._last_poll: float | None = None
+        self._next_poll_in: float = 0
+        self.fleet_managed = False
+        # Cleared for miners created from the cache until the setup admission
+        # has let their first refresh through
+        self._admitted = asyncio.Event()
+        self._admitted.set()
+        self._admitting = False
+        self.breaker = MinerCircuitBreaker()
+        self._notified_values: dict[tuple, Any] | None = None
+        self._notified_success: bool | None = None
+        self.perf: PerfStats | None = None
+        self.setup_times: dict[str, float] = {}
+        self.commands = MinerCommandQueue(self._async_commands_drained)
+        self.capabilities: dict[str, Any] = {}
+        self.history = MinerHistory()
+        self.transport = transport
+        self._power_limit_range = PowerLimitRange(
+            min=entry.data.get(CONF_MIN_POWER, 15),
+            max=entry.data.get(CONF_MAX_POWER, 10000),
+        )
+        # None fetches everything, until the entities have been created
+        self._entity_data_options: set[pyasic.DataOptions] | None = None
+        if entry.options.get(CONF_PERF_STATS, DEFAULT_PERF_STATS):
+            self.perf = PerfStats()
+        fan_deadband = entry.options.get(CONF_FAN_DEADBAND, DEFAULT_FAN_DEADBAND)
+        temperature_deadband = entry.options.get(
+            CONF_TEMPERATURE_DEADBAND, DEFAULT_TEMPERATURE_DEADBAND
+        )
+        self._deadbands = {
+            "fan_speed": fan_deadband,
+            "temperature": temperature_deadband,
+            "board_temperature": temperature_deadband,
+            "chip_temperature": temperature_deadband,
+        }
+        self.poll_interval = AdaptivePollInterval(
+            base=entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+            minimum=entry.options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+            maximum=entry.options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL),
+        )
         super().__init__(
             hass=hass,
             logger=_LOGGER,
             config_entry=entry,
             name=entry.title,
-            update_interval=timedelta(seconds=10),
+            update_interval=timedelta(seconds=self.poll_interval.base),
             request_refresh_debouncer=Debouncer(
                 hass,
                 _LOGGER,
@@ -81,34 +326,480 @@ class MinerCoordinator(DataUpdateCoordinator):
                 immediate=True,
             ),
         )
+        if miner is not None:
+            self.miner = self._apply_credentials(miner)
+            self._miner_stale = False
+            self.miner_detections += 1
+            self.capabilities = miner_capabilities(miner)
 
     @property
     def available(self):
         """Return if device is available or not."""
         return self.miner is not None
 
-    async def get_miner(self):
-        """Get a valid Miner instance."""
+    def perf_stats(self) -> dict[str, Any]:
+        """Return the performance statistics of the miner."""
+        return {
+            "name": self.config_entry.title,
+            "ip": self.config_entry.data[CONF_IP],
+            "enabled": self.perf is not None,
+            "setup": self.setup_times,
+            "miner_cache": {
+                "hits": self.miner_cache_hits,
+                "detections": self.miner_detections,
+            },
+            "connections": (
+                self.transport.stats() if self.transport is not None else {}
+            ),
+            "phases": self.perf.summary() if self.perf is not None else {},
+        }
+
+    async def get_miner(self, force_detect: bool = False):
+        """Get a valid Miner instance.
+
+        The detected miner is cached for the lifetime of the config entry and
+        only detected again once it has been invalidated or when forced.
+        """
+        if self.miner is not None and not self._miner_stale and not force_detect:
+            self.miner_cache_hits += 1
+            return self.miner
+
+        previous = self.miner
         miner_ip = self.config_entry.data[CONF_IP]
-        miner = await pyasic.get_miner(miner_ip)
+        if self.perf is None:
+            miner = await pyasic.get_miner(miner_ip)
+        else:
+            start = time.perf_counter()
+            miner = await pyasic.get_miner(miner_ip)
+            self.perf.record(PHASE_DETECT, time.perf_counter() - start)
+        self.miner_detections += 1
         if miner is None:
             return None
 
-        self.miner = miner
-        if self.miner.api is not None:
-            if self.miner.api.pwd is not None:
-                self.miner.api.pwd = self.config_entry.data.get(CONF_RPC_PASSWORD, "")
+        self.miner = self._apply_credentials(miner)
+        self._miner_stale = False
+        self.capabilities = miner_capabilities(miner)
+        if previous is not None and type(previous.web) is type(miner.web):
+            # Keep the web login of a miner that was only detected again
+            token = getattr(previous.web, "token", None)
+            if token is not None and not token_expired(token):
+                miner.web.token = token
+        return self.miner
+
+    @callback
+    def async_set_cached_identity(self, identity: dict[str, Any]) -> None:
+        """Start from a cached identity until the miner has been detected.
 
-        if self.miner.web is not None:
-            self.miner.web.username = self.config_entry.data.get(CONF_WEB_USERNAME, "")
-            self.miner.web.pwd = self.config_entry.data.get(CONF_WEB_PASSWORD, "")
+        The entities can be created from it right away, they stay unavailable
+        until the first successful poll.
+        """
+        self.capabilities = {
+            key: value for key, value in identity.items() if key not in IDENTITY_KEYS
+        }
+        self.data = replace(
+            self._offline_data(), **{key: identity[key] for key in IDENTITY_KEYS}
+        )
+        self._admitted.clear()
 
-        if self.miner.ssh is not None:
-            self.miner.ssh.username = self.config_entry.data.get(CONF_SSH_USERNAME, "")
-            self.miner.ssh.pwd = self.config_entry.data.get(CONF_SSH_PASSWORD, "")
-        return self.miner
+    async def async_admitted_refresh(self) -> None:
+        """Run the first refresh of a miner created from its cached identity.
+
+        Called once the setup admission has granted a slot.  Until then the
+        coordinator neither schedules nor runs polls of its own.
+        """
+        self._admitting = True
+        try:
+            await self.async_refresh()
+        finally:
+            self._admitting = False
+            self._admitted.set()
+
+    @property
+    def awaiting_admission(self) -> bool:
+        """Return if the first refresh still waits for the setup admission."""
+        return not self._admitted.is_set() and not self._admitting
+
+    async def _handle_refresh_interval(self, _now: Any = None) -> None:
+        """Poll on the timer, unless commands are being sent to the miner.
+
+        The queue refreshes once its commands are done, which also schedules
+        the next poll again.
+        """
+        if self.commands.busy:
+            _LOGGER.debug("%s: skipping poll, commands pending.", self.name)
+            self._unsub_refresh = None
+            return
+        await super()._handle_refresh_interval(_now)
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next poll, once the first refresh has been admitted."""
+        if self.awaiting_admission:
+            return
+        super()._schedule_refresh()
+
+    def _apply_credentials(self, miner: pyasic.AnyMiner) -> pyasic.AnyMiner:
+        """Copy the credentials of the config entry onto a miner."""
+        if miner.api is not None:
+            if miner.api.pwd is not None:
+                miner.api.pwd = self.config_entry.data.get(CONF_RPC_PASSWORD, "")
+
+        if miner.web is not None:
+            miner.web.username = self.config_entry.data.get(CONF_WEB_USERNAME, "")
+            miner.web.pwd = self.config_entry.data.get(CONF_WEB_PASSWORD, "")
+            if self.transport is not None:
+                self.transport.set_credentials(miner.web.username, miner.web.pwd)
+
+        if miner.ssh is not None:
+            miner.ssh.username = self.config_entry.data.get(CONF_SSH_USERNAME, "")
+            miner.ssh.pwd = self.config_entry.data.get(CONF_SSH_PASSWORD, "")
+        return miner
+
+    def invalidate_miner(self) -> None:
+        """Force the miner to be detected again on the next update."""
+        self._miner_stale = True
+        # Fetch identity and config again once the miner is reconnected, the
+        # last identity is kept to tell if it is still the same miner
+        self._identity_stale = True
+        self._config = None
+
+    @callback
+    def async_update_data_options(self, _event: Event | None = None) -> None:
+        """Work out the data needed by the enabled entities of the miner.
+
+        Called once the entities exist and whenever an entity is enabled or
+        disabled, so data of disabled entities is neither fetched nor parsed.
+        """
+        registry = er.async_get(self.hass)
+        entries = er.async_entries_for_config_entry(
+            registry, self.config_entry.entry_id
+        )
+        if not entries:
+            self._entity_data_options = None
+            return
+
+        options = set(CORE_DATA_OPTIONS)
+        for entry in entries:
+            if entry.disabled_by is not None:
+                continue
+            # Unique ids are "<mac>-<sensor>" or "<mac>-<index>-<sensor>"
+            suffix = entry.unique_id.partition("-")[2]
+            if suffix not in ENTITY_DATA_OPTIONS:
+                suffix = suffix.partition("-")[2]
+            if (option := ENTITY_DATA_OPTIONS.get(suffix)) is None:
+                continue
+            capability = ENTITY_CAPABILITIES.get(suffix)
+            if capability is None or self.capabilities.get(capability):
+                options.add(option)
+
+        fleet_temperature = registry.async_get_entity_id(
+            Platform.SENSOR, DOMAIN, FLEET_TEMPERATURE_UNIQUE_ID
+        )
+        if (
+            fleet_temperature is not None
+            and not registry.async_get(fleet_temperature).disabled
+        ):
+            options.add(pyasic.DataOptions.HASHBOARDS)
+
+        if options != self._entity_data_options:
+            _LOGGER.debug(
+                "%s: fetching %s.",
+                self.name,
+                ", ".join(sorted(option.value for option in options)),
+            )
+        self._entity_data_options = options
+
+    @callback
+    def entity_enabled_changed(
+        self, event_data: er.EventEntityRegistryUpdatedData
+    ) -> bool:
+        """Return if a registry update enabled or disabled an entity it feeds.
+
+        These are the entities of the miner and the fleet temperature sensor.
+        """
+        if event_data["action"] != "update":
+            return False
+        if "disabled_by" not in event_data["changes"]:
+            return False
+        entry = er.async_get(self.hass).async_get(event_data["entity_id"])
+        if entry is None:
+            return False
+        if entry.config_entry_id == self.config_entry.entry_id:
+            return True
+        return (
+            entry.platform == DOMAIN and entry.unique_id == FLEET_TEMPERATURE_UNIQUE_ID
+        )
+
+    def _data_options(self) -> list[pyasic.DataOptions]:
+        """Return the data to fetch from the miner in the current cycle."""
+        needed = self._entity_data_options
+        if needed is None:
+            include = list(TELEMETRY_DATA_OPTIONS)
+        else:
+            include = [option for option in TELEMETRY_DATA_OPTIONS if option in needed]
+
+        config_interval = self.config_entry.options.get(
+            CONF_CONFIG_INTERVAL, DEFAULT_CONFIG_INTERVAL
+        )
+        if (needed is None or pyasic.DataOptions.CONFIG in needed) and (
+            self._config is None or self._cycle % max(config_interval, 1) == 0
+        ):
+            include.extend(CONFIG_DATA_OPTIONS)
+
+        identity_interval = self.config_entry.options.get(
+            CONF_IDENTITY_INTERVAL, DEFAULT_IDENTITY_INTERVAL
+        )
+        if self._identity_stale or (
+            identity_interval > 0 and self._cycle % identity_interval == 0
+        ):
+            include.extend(IDENTITY_DATA_OPTIONS)
+
+        return include
+
+    def config_fresh(self) -> bool:
+        """Return if the cached config is recent enough to change it directly.
+
+        The config is fetched again every few polls anyway, so it counts as
+        fresh until the next of those fetches is due.
+        """
+        if self._config is None or self._config_time is None:
+            return False
+        config_interval = self.config_entry.options.get(
+            CONF_CONFIG_INTERVAL, DEFAULT_CONFIG_INTERVAL
+        )
+        max_age = max(config_interval, 1) * self.poll_interval.base
+        return time.monotonic() - self._config_time <= max_age
+
+    async def async_update_config(
+        self, update: Callable[[pyasic.MinerConfig], None]
+    ) -> pyasic.MinerConfig:
+        """Change the config of the miner and show the change right away.
+
+        ``update`` changes the cached config of the last poll if it is fresh,
+        otherwise the config is fetched from the miner first.  Once sent, the
+        new config is written to the coordinator data without waiting for the
+        next poll.
+        """
+        if self.config_fresh():
+            config = self._config.model_copy(deep=True)
+        else:
+            config = await self.miner.get_config()
+        update(config)
+        await self.miner.send_config(config)
+
+        self._config = config
+        self._config_time = time.monotonic()
+        if self.data is not None and self.last_update_success:
+            self.async_set_updated_data(self._data_with_config(self.data))
+        return config
+
+    def _data_with_config(self, data: MinerSnapshot) -> MinerSnapshot:
+        """Return a copy of the coordinator data with the cached config."""
+        return replace(
+            data,
+            config=self._config,
+            miner_sensors=replace(
+                data.miner_sensors, active_preset_name=self._active_preset_name()
+            ),
+        )
+
+    def _active_preset_name(self) -> str | None:
+        """Return the name of the active tuning preset of the cached config."""
+        try:
+            return self._config.mining_mode.active_preset.name
+        except AttributeError:
+            return None
+
+    def _check_miner_identity(self, miner_data: pyasic.MinerData) -> None:
+        """Invalidate the cached miner if the device behind the IP has changed.
+
+        A miner that was detected again since the last identity fetch already
+        is the new device, the change is only logged then.
+        """
+        if self._identity is None:
+            return
+        old_mac = self._identity["mac"]
+        old_fw_ver = self._identity["fw_ver"]
+        if old_mac and miner_data.mac and old_mac != miner_data.mac:
+            change = f"MAC changed from {old_mac} to {miner_data.mac}"
+        elif old_fw_ver and miner_data.fw_ver and old_fw_ver != miner_data.fw_ver:
+            change = f"firmware changed from {old_fw_ver} to {miner_data.fw_ver}"
+        else:
+            return
+        if self._identity_stale:
+            _LOGGER.info("%s: %s.", self.config_entry.title, change)
+            return
+        _LOGGER.info("%s: %s, detecting miner again.", self.config_entry.title, change)
+        self.invalidate_miner()
+
+    @callback
+    def async_note_control_action(self) -> None:
+        """Poll the miner faster right after its settings were changed."""
+        self.poll_interval.boost()
+        self._next_poll_in = self.poll_interval.minimum
+        if not self.fleet_managed:
+            self.update_interval = timedelta(seconds=self._next_poll_in)
+            self._schedule_refresh()
+
+    async def _async_commands_drained(self) -> None:
+        """Confirm the changes of the sent commands with a single refresh."""
+        self.async_note_control_action()
+        await self.async_refresh()
+
+    def poll_due(self, slack: float = 0) -> bool:
+        """Return if a poll is due and not held back by admission or commands."""
+        if self.awaiting_admission or self.commands.busy:
+            return False
+        if self._last_poll is None:
+            return True
+        return time.monotonic() - self._last_poll >= self._next_poll_in - slack
+
+    def _adapt_poll_interval(self, data: MinerSnapshot | None) -> None:
+        """Compute the interval until the next poll."""
+        self._last_poll = time.monotonic()
+        is_mining = data.is_mining if data is not None else None
+        self._next_poll_in = max(
+            self.poll_interval.next_interval(is_mining, self._failure_count),
+            self.breaker.retry_in,
+        )
+        if not self.fleet_managed:
+            self.update_interval = timedelta(seconds=self._next_poll_in)
+
+    def _value_changed(self, context: tuple, old: Any, new: Any) -> bool:
+        """Return if a value moved enough to be written to the state machine."""
+        if old == new:
+            return False
+        deadband = self._deadbands.get(context[-1])
+        if deadband and isinstance(old, int | float) and isinstance(new, int | float):
+            return abs(new - old) >= deadband
+        return True
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners, timing the entity updates if enabled."""
+        if self.perf is None:
+            self._async_notify_listeners()
+            return
+        start = time.perf_counter()
+        self._async_notify_listeners()
+        self.perf.record(PHASE_ENTITIES, time.perf_counter() - start)
+
+    @callback
+    def _async_notify_listeners(self) -> None:
+        """Update only the listeners whose data has changed.
+
+        Entities register with their path in the data as context, listeners
+        without a context are always updated.
+        """
+        values = None
+        if self.last_update_success and self.data is not None:
+            values = snapshot_values(self.data)
+
+        previous = self._notified_values
+        if (
+            values is None
+            or previous is None
+            or self._notified_success is not self.last_update_success
+            or any(
+                values.get((key,)) != previous.get((key,)) for key in DEVICE_DATA_KEYS
+            )
+        ):
+            self._notified_values = values
+            self._notified_success = self.last_update_success
+            super().async_update_listeners()
+            return
+
+        changed = set()
+        for context, value in values.items():
+            if context not in previous or self._value_changed(
+                context, previous[context], value
+            ):
+                # Only move the reference value on a write, so small changes
+                # cannot creep past the deadband
+                previous[context] = value
+                changed.add(context)
+        for context in previous.keys() - values.keys():
+            del previous[context]
+            changed.add(context)
+
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or context in changed:
+                update_callback()
+
+    def _offline_data(self) -> MinerSnapshot:
+        """Return zeroed data for a miner that could not be reached."""
+        return MinerSnapshot(power_limit_range=self._power_limit_range)
+
+    def _record_breaker_failure(self) -> None:
+        """Count a failed poll on the circuit breaker."""
+        self.breaker.record_failure()
+        if self.breaker.state is CircuitState.OPEN:
+            _LOGGER.warning(
+                "%s: miner unreachable, pausing polls for %.0fs.",
+                self.name,
+                self.breaker.retry_in,
+            )
+
+    async def _async_probe(self) -> bool:
+        """Check if the miner accepts connections at all."""
+        miner_ip = self.config_entry.data[CONF_IP]
+
+        async def _connect(port: int) -> bool:
+            try:
+                async with asyncio.timeout(PROBE_TIMEOUT):
+                    _, writer = await asyncio.open_connection(miner_ip, port)
+            except (OSError, TimeoutError):
+                return False
+            writer.close()
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
+            return True
+
+        return any(await asyncio.gather(*(_connect(port) for port in PROBE_PORTS)))
 
     async def _async_update_data(self):
+        """Poll the miner, timing the update if enabled."""
+        if self.awaiting_admission:
+            # Cached miners are first polled when the setup admission says so
+            await self._admitted.wait()
+        async with self.commands.lock:
+            if self.perf is None:
+                return await self._async_poll_miner()
+            start = time.perf_counter()
+            try:
+                return await self._async_poll_miner()
+            finally:
+                self.perf.record(PHASE_UPDATE, time.perf_counter() - start)
+
+    async def _async_poll_miner(self):
+        """Fetch sensors from miners and adapt the poll interval."""
+        if not self.breaker.allow_request():
+            raise UpdateFailed(
+                f"Miner offline, next probe in {self.breaker.retry_in:.0f}s"
+            )
+
+        if self.breaker.state is CircuitState.HALF_OPEN:
+            if not await self._async_probe():
+                self._record_breaker_failure()
+                self._adapt_poll_interval(None)
+                raise UpdateFailed("Miner offline, probe failed")
+            _LOGGER.debug("%s: probe succeeded, resuming polls.", self.name)
+
+        try:
+            data = await self._async_fetch_data()
+        except Exception:
+            self._record_breaker_failure()
+            self._adapt_poll_interval(None)
+            raise
+
+        if self._failure_count:
+            self._record_breaker_failure()
+        else:
+            self.breaker.record_success()
+        self._adapt_poll_interval(data)
+        return data
+
+    async def _async_fetch_data(self):
         """Fetch sensors from miners."""
 
         miner = await self.get_miner()
@@ -120,58 +811,82 @@ class MinerCoordinator(DataUpdateCoordinator):
                 _LOGGER.warning(
                     "Miner is offline – returning zeroed data (first failure)."
                 )
-                return {
-                    **DEFAULT_DATA,
-                    "power_limit_range": {
-                        "min": self.config_entry.data.get(CONF_MIN_POWER, 15),
-                        "max": self.config_entry.data.get(CONF_MAX_POWER, 10000),
-                    },
-                }
+                return self._offline_data()
 
             raise UpdateFailed("Miner Offline (consecutive failure)")
 
         # At this point, miner is valid
         _LOGGER.debug(f"Found miner: {self.miner}")
+        if miner.web is not None and token_expired(getattr(miner.web, "token", None)):
+            # Log in before the first request instead of after it failed
+            miner.web.token = None
 
+        include = self._data_options()
+        start = time.monotonic()
         try:
-            miner_data = await self.miner.get_data(
-                include=[
-                    pyasic.DataOptions.HOSTNAME,
-                    pyasic.DataOptions.MAC,
-                    pyasic.DataOptions.IS_MINING,
-                    pyasic.DataOptions.FW_VERSION,
-                    pyasic.DataOptions.HASHRATE,
-                    pyasic.DataOptions.EXPECTED_HASHRATE,
-                    pyasic.DataOptions.HASHBOARDS,
-                    pyasic.DataOptions.WATTAGE,
-                    pyasic.DataOptions.WATTAGE_LIMIT,
-                    pyasic.DataOptions.FANS,
-                    pyasic.DataOptions.CONFIG,
-                ]
-            )
+            miner_data = await self.miner.get_data(include=include)
         except Exception as err:
             self._failure_count += 1
+            if not isinstance(err, TRANSIENT_ERRORS):
+                # The miner answered in a way its API does not expect, it may
+                # have changed firmware or IP, detect it again
+                self.invalidate_miner()
 
             if self._failure_count == 1:
                 _LOGGER.warning(
                     f"Error fetching miner data: {err} – returning zeroed data (first failure)."
                 )
-                return {
-                    **DEFAULT_DATA,
-                    "power_limit_range": {
-                        "min": self.config_entry.data.get(CONF_MIN_POWER, 15),
-                        "max": self.config_entry.data.get(CONF_MAX_POWER, 10000),
-                    },
-                }
+                return self._offline_data()
 
             _LOGGER.exception(err)
             raise UpdateFailed from err
 
+        fetch_time = time.monotonic() - start
+        self.poll_interval.record_latency(fetch_time)
+        if self.perf is not None:
+            self.perf.record(PHASE_FETCH, fetch_time)
         _LOGGER.debug(f"Got data: {miner_data}")
 
+        if (
+            miner_data.hashrate is None
+            and miner_data.wattage is None
+            and not any(board.hashrate for board in miner_data.hashboards)
+        ):
+            # pyasic swallows connection errors and returns its defaults, an
+            # empty result means the cached miner did not answer at all.
+            # Drop it, the miner is unavailable until it is detected again.
+            self._failure_count += 1
+            self.invalidate_miner()
+            self.miner = None
+            raise UpdateFailed("Miner returned no data")
+
+        if pyasic.DataOptions.MAC in include:
+            self._check_miner_identity(miner_data)
+            self._identity = {
+                "hostname": miner_data.hostname,
+                "mac": miner_data.mac,
+                "fw_ver": miner_data.fw_ver,
+            }
+            self._identity_stale = False
+        if pyasic.DataOptions.CONFIG in include:
+            self._config = miner_data.config
+            self._config_time = time.monotonic()
+
         # Success: reset the failure count
         self._failure_count = 0
+        self._cycle += 1
+
+        if self.perf is None:
+            data = self._build_data(miner_data)
+        else:
+            start = time.perf_counter()
+            data = self._build_data(miner_data)
+            self.perf.record(PHASE_TRANSFORM, time.perf_counter() - start)
+        self.history.record(data)
+        return data
 
+    def _build_data(self, miner_data: pyasic.MinerData) -> MinerSnapshot:
+        """Convert the miner data into the coordinator data."""
         try:
             hashrate = round(float(miner_data.hashrate), 2)
         except TypeError:
@@ -182,43 +897,35 @@ class MinerCoordinator(DataUpdateCoordinator):
         except TypeError:
             expected_hashrate = None
 
-        try:
-            active_preset = miner_data.config.mining_mode.active_preset.name
-        except AttributeError:
-            active_preset = None
-
-        data = {
-            "hostname": miner_data.hostname,
-            "mac": miner_data.mac,
-            "make": miner_data.make,
-            "model": miner_data.model,
-            "ip": self.miner.ip,
-            "is_mining": miner_data.is_mining,
-            "fw_ver": miner_data.fw_ver,
-            "miner_sensors": {
-                "hashrate": hashrate,
-                "ideal_hashrate": expected_hashrate,
-                "active_preset_name": active_preset,
-                "temperature": miner_data.temperature_avg,
-                "power_limit": miner_data.wattage_limit,
-                "miner_consumption": miner_data.wattage,
-                "efficiency": miner_data.efficiency_fract,
-            },
-            "board_sensors": {
-                board.slot: {
-                    "board_temperature": board.temp,
-                    "chip_temperature": board.chip_temp,
-                    "board_hashrate": round(float(board.hashrate or 0), 2),
-                }
+        return MinerSnapshot(
+            hostname=self._identity["hostname"],
+            mac=self._identity["mac"],
+            make=miner_data.make,
+            model=miner_data.model,
+            ip=self.miner.ip,
+            is_mining=miner_data.is_mining,
+            fw_ver=self._identity["fw_ver"],
+            miner_sensors=MinerSensors(
+                hashrate=hashrate,
+                ideal_hashrate=expected_hashrate,
+                active_preset_name=self._active_preset_name(),
+                temperature=miner_data.temperature_avg,
+                power_limit=miner_data.wattage_limit,
+                miner_consumption=miner_data.wattage,
+                efficiency=miner_data.efficiency_fract,
+            ),
+            board_sensors={
+                board.slot: BoardSensors(
+                    board_temperature=board.temp,
+                    chip_temperature=board.chip_temp,
+                    board_hashrate=round(float(board.hashrate or 0), 2),
+                )
                 for board in miner_data.hashboards
             },
-            "fan_sensors": {
-                idx: {"fan_speed": fan.speed} for idx, fan in enumerate(miner_data.fans)
+            fan_sensors={
+                idx: FanSensors(fan_speed=fan.speed)
+                for idx, fan in enumerate(miner_data.fans)
             },
-            "config": miner_data.config,
-            "power_limit_range": {
-                "min": self.config_entry.data.get(CONF_MIN_POWER, 15),
-                "max": self.config_entry.data.get(CONF_MAX_POWER, 10000),
-            },
-        }
-        return data
+            config=self._config,
+            power_limit_range=self._power_limit_range,
+        )
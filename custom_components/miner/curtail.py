@@ -0,0 +1,213 @@
+"""Planning and execution of fleet power curtailment."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .batch import async_run_batch
+from .commands import COMMAND_MINING
+from .commands import COMMAND_POWER_LIMIT
+
+if TYPE_CHECKING:
+    import pyasic
+
+    from .coordinator import MinerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+ACTION_KEEP = "keep"
+ACTION_THROTTLE = "throttle"
+ACTION_PAUSE = "pause"
+
+# Power limits are set in steps of this many watts, like the number entity
+POWER_LIMIT_STEP = 100
+
+
+@dataclass
+class MinerLoad:
+    """Power state of a single miner used to plan a curtailment."""
+
+    device_id: str
+    name: str
+    consumption: float
+    min_power: float
+    efficiency: float | None
+    can_throttle: bool
+    can_pause: bool
+
+
+@dataclass
+class CurtailAction:
+    """What to do with a single miner."""
+
+    miner: MinerLoad
+    action: str = ACTION_KEEP
+    power_limit: int | None = None
+
+    @property
+    def expected_consumption(self) -> float:
+        """Return the consumption expected after the action."""
+        if self.action == ACTION_PAUSE:
+            return 0
+        if self.action == ACTION_THROTTLE:
+            return min(self.power_limit, self.miner.consumption)
+        return self.miner.consumption
+
+    def as_dict(self) -> dict:
+        """Return the action as a service response item."""
+        return {
+            "device_id": self.miner.device_id,
+            "name": self.miner.name,
+            "action": self.action,
+            "consumption": self.miner.consumption,
+            "power_limit": self.power_limit,
+            "expected_consumption": self.expected_consumption,
+        }
+
+
+def miner_load(device_id: str, coordinator: MinerCoordinator) -> MinerLoad | None:
+    """Return the power state of a miner, None if its consumption is unknown."""
+    data = coordinator.data
+    miner = coordinator.miner
+    if not coordinator.last_update_success or data is None or miner is None:
+        return None
+    consumption = data.miner_sensors.miner_consumption
+    if not consumption or not data.is_mining:
+        return None
+    return MinerLoad(
+        device_id=device_id,
+        name=coordinator.config_entry.title,
+        consumption=consumption,
+        min_power=data.power_limit_range.min,
+        efficiency=data.miner_sensors.efficiency,
+        can_throttle=bool(miner.supports_autotuning),
+        can_pause=bool(miner.supports_shutdown),
+    )
+
+
+def plan_curtailment(
+    miners: list[MinerLoad], target: float, allow_pause: bool = True
+) -> list[CurtailAction]:
+    """Plan which miners to throttle or pause to reach a total consumption.
+
+    The least efficient miners are curtailed first.  Throttling is preferred,
+    miners are only paused if throttling every tunable miner down to its
+    minimum power is not enough.
+    """
+    # Highest J/TH first, miners without efficiency data last
+    ordered = sorted(
+        miners,
+        key=lambda m: -m.efficiency if m.efficiency is not None else math.inf,
+    )
+    actions = [CurtailAction(miner) for miner in ordered]
+    excess = sum(miner.consumption for miner in miners) - target
+
+    for action in actions:
+        if excess <= 0:
+            break
+        miner = action.miner
+        if not miner.can_throttle or miner.consumption <= miner.min_power:
+            continue
+        limit = max(miner.consumption - excess, miner.min_power)
+        limit = max(
+            math.floor(limit / POWER_LIMIT_STEP) * POWER_LIMIT_STEP, miner.min_power
+        )
+        action.action = ACTION_THROTTLE
+        action.power_limit = int(limit)
+        excess -= miner.consumption - action.expected_consumption
+
+    if allow_pause:
+        for action in actions:
+            if excess <= 0:
+                break
+            if not action.miner.can_pause:
+                continue
+            excess -= action.expected_consumption
+            action.action = ACTION_PAUSE
+            action.power_limit = None
+
+    return actions
+
+
+async def async_apply_curtailment(
+    targets: dict[str, MinerCoordinator],
+    actions: list[CurtailAction],
+    target: float,
+    wave_size: int,
+    wave_interval: float,
+    timeout: float,
+) -> list[dict]:
+    """Apply planned actions in waves and confirm the consumption after each.
+
+    Waves of ``wave_size`` miners are applied ``wave_interval`` seconds apart.
+    After each wave the changed miners are refreshed, and no further waves are
+    sent once the fleet consumption is at or below the target.
+    """
+    pending = [action for action in actions if action.action != ACTION_KEEP]
+    planned = {targets[action.miner.device_id]: action for action in pending}
+    waves = []
+
+    async def _apply(coordinator: MinerCoordinator, miner: pyasic.AnyMiner) -> None:
+        action = planned[coordinator]
+        if action.action == ACTION_PAUSE:
+            result = await coordinator.commands.async_run(
+                COMMAND_MINING, miner.stop_mining
+            )
+        else:
+            result = await coordinator.commands.async_run(
+                COMMAND_POWER_LIMIT,
+                lambda: miner.set_power_limit(action.power_limit),
+            )
+        if result is False:
+            raise RuntimeError(f"Miner rejected {action.action}")
+
+    for start in range(0, len(pending), wave_size):
+        if waves:
+            await asyncio.sleep(wave_interval)
+        wave = pending[start : start + wave_size]
+        wave_targets = [
+            (action.miner.device_id, targets[action.miner.device_id]) for action in wave
+        ]
+        results = await async_run_batch(
+            wave_targets, _apply, max_concurrent=wave_size, timeout=timeout
+        )
+
+        # The command queues refresh the changed miners once they are done
+        await asyncio.gather(
+            *(coordinator.commands.async_join() for _, coordinator in wave_targets)
+        )
+        consumption = fleet_consumption(targets.values())
+        waves.append(
+            {
+                "wave": len(waves) + 1,
+                "succeeded": sum(result["success"] for result in results),
+                "failed": sum(not result["success"] for result in results),
+                "consumption": consumption,
+                "results": results,
+            }
+        )
+        _LOGGER.info(
+            "Curtailment wave %s of %s miners applied, fleet consumption %sW "
+            "(target %sW).",
+            len(waves),
+            len(wave),
+            consumption,
+            target,
+        )
+        if consumption <= target:
+            break
+
+    return waves
+
+
+def fleet_consumption(coordinators) -> float:
+    """Return the summed consumption of the miners with known data."""
+    total = 0
+    for coordinator in coordinators:
+        if coordinator.data is None or not coordinator.last_update_success:
+            continue
+        total += coordinator.data.miner_sensors.miner_consumption or 0
+    return total
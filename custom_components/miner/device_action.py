@@ -11,9 +11,11 @@ from homeassistant.const import CONF_TYPE
 from homeassistant.core import Context
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.typing import ConfigType
 
 from .const import DOMAIN
+from .const import FLEET_UNIQUE_ID
 from .const import SERVICE_REBOOT
 from .const import SERVICE_RESTART_BACKEND
 from .const import SERVICE_SET_WORK_MODE
@@ -47,6 +49,11 @@ async def async_get_actions(
     """List device actions for Miner devices."""
     actions = []
 
+    device = dr.async_get(hass).async_get(device_id)
+    if device is None or (DOMAIN, FLEET_UNIQUE_ID) in device.identifiers:
+        # The fleet device has no miner to act on
+        return actions
+
     base_action = {
         CONF_DEVICE_ID: device_id,
         CONF_DOMAIN: DOMAIN,
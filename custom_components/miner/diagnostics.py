@@ -0,0 +1,43 @@
+"""Diagnostics support for Miner."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_RPC_PASSWORD
+from .const import CONF_SSH_PASSWORD
+from .const import CONF_SSH_USERNAME
+from .const import CONF_WEB_PASSWORD
+from .const import CONF_WEB_USERNAME
+from .const import DATA_FLEET
+from .const import DOMAIN
+from .const import FLEET_UNIQUE_ID
+
+TO_REDACT = {
+    CONF_RPC_PASSWORD,
+    CONF_SSH_PASSWORD,
+    CONF_SSH_USERNAME,
+    CONF_WEB_PASSWORD,
+    CONF_WEB_USERNAME,
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    fleet = hass.data.get(DATA_FLEET)
+    diagnostics = {
+        "entry": {
+            "data": async_redact_data(config_entry.data, TO_REDACT),
+            "options": dict(config_entry.options),
+        },
+        "fleet": fleet.stats if fleet is not None else None,
+    }
+    if config_entry.unique_id != FLEET_UNIQUE_ID:
+        coordinator = hass.data[DOMAIN][config_entry.entry_id]
+        diagnostics["perf_stats"] = coordinator.perf_stats()
+    return diagnostics
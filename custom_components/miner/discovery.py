@@ -0,0 +1,94 @@
+"""Discovery of miners on the local networks."""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+import time
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING
+
+from homeassistant.components import network
+from homeassistant.core import HomeAssistant
+
+from .bootstrap import async_import_pyasic
+
+if TYPE_CHECKING:
+    import pyasic
+
+_LOGGER = logging.getLogger(__name__)
+
+# Maximum number of hosts probed at the same time, across all networks
+DISCOVERY_MAX_CONNECTIONS = 256
+
+
+async def async_get_discovery_hosts(
+    hass: HomeAssistant,
+) -> list[ipaddress.IPv4Address]:
+    """Return the hosts of all IPv4 networks of the enabled adapters."""
+    hosts: set[ipaddress.IPv4Address] = set()
+    own_addresses = set()
+    for adapter in await network.async_get_adapters(hass):
+        for ip_info in adapter["ipv4"]:
+            local_ip = ip_info["address"]
+            own_addresses.add(ipaddress.IPv4Address(local_ip))
+            subnet = ipaddress.ip_network(
+                f"{local_ip}/{ip_info['network_prefix']}", strict=False
+            )
+            hosts.update(subnet.hosts())
+    return sorted(hosts - own_addresses)
+
+
+async def async_discover_miners(
+    hass: HomeAssistant, max_connections: int = DISCOVERY_MAX_CONNECTIONS
+) -> AsyncIterator[pyasic.AnyMiner]:
+    """Yield miners on the local networks as they answer.
+
+    A fixed pool of ``max_connections`` workers takes the hosts of all
+    networks one after the other, so only that many probes and tasks exist at
+    any time.  When the caller stops iterating the workers finish the probe
+    they are running and take no new host, so taking the first result
+    returns on the first hit.
+    """
+    hosts = await async_get_discovery_hosts(hass)
+    pyasic = await async_import_pyasic(hass)
+    miner_net = pyasic.MinerNetwork(hosts)
+    start = time.monotonic()
+    pending = iter(hosts)
+    # Discovered miners, None once a worker ran out of hosts
+    found: asyncio.Queue[pyasic.AnyMiner | None] = asyncio.Queue()
+    stopped = False
+
+    async def _worker() -> None:
+        for host in pending:
+            if stopped:
+                break
+            try:
+                miner = await miner_net.ping_and_get_miner(host)
+            except Exception:  # a bad host must not end the scan
+                miner = None
+            if miner is not None:
+                found.put_nowait(miner)
+        found.put_nowait(None)
+
+    # Cancelling a probe half way would leave the connection attempts of
+    # pyasic behind, the workers are left to finish on their own instead
+    workers = min(max_connections, len(hosts))
+    for _ in range(workers):
+        hass.async_create_background_task(_worker(), "miner discovery")
+    try:
+        while workers:
+            if (miner := await found.get()) is None:
+                workers -= 1
+                continue
+            _LOGGER.debug(
+                "Discovered %s after %.2fs.", miner, time.monotonic() - start
+            )
+            yield miner
+    finally:
+        stopped = True
+        _LOGGER.debug(
+            "Discovery of %s hosts stopped after %.2fs.",
+            len(hosts),
+            time.monotonic() - start,
+        )
@@ -0,0 +1,186 @@
+"""Fleet wide polling for Miner coordinators."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+from homeassistant.core import CALLBACK_TYPE
+from homeassistant.core import HomeAssistant
+
+if TYPE_CHECKING:
+    from .coordinator import MinerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FleetScheduler:
+    """Poll all Miner coordinators from a single loop.
+
+    Polls are spread evenly across the interval and the number of miners
+    being polled at the same time is capped by a semaphore.  Coordinators
+    registered here have their own timer disabled, the results of each poll
+    are pushed to their listeners by the coordinator refresh.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, interval: timedelta, max_concurrent: int
+    ) -> None:
+        """Initialize the fleet scheduler."""
+        self.hass = hass
+        self.interval = interval
+        self.max_concurrent = max_concurrent
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._coordinators: dict[str, MinerCoordinator] = {}
+        self._polling: set[str] = set()
+        self._task: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+        self.cycles = 0
+        self.last_cycle_duration: float | None = None
+        self.queue_depth = 0
+        self.peak_queue_depth = 0
+        self.in_flight = 0
+        self.skipped_polls = 0
+
+    @property
+    def stats(self) -> dict:
+        """Return statistics about the fleet polling."""
+        return {
+            "miners": len(self._coordinators),
+            "interval": self.interval.total_seconds(),
+            "max_concurrent": self.max_concurrent,
+            "cycles": self.cycles,
+            "last_cycle_duration": self.last_cycle_duration,
+            "queue_depth": self.queue_depth,
+            "peak_queue_depth": self.peak_queue_depth,
+            "in_flight": self.in_flight,
+            "skipped_polls": self.skipped_polls,
+        }
+
+    @callback
+    def async_register(self, coordinator: MinerCoordinator) -> CALLBACK_TYPE:
+        """Take over polling of a coordinator."""
+        entry_id = coordinator.config_entry.entry_id
+        coordinator.fleet_managed = True
+        coordinator.update_interval = None
+        self._coordinators[entry_id] = coordinator
+        if self._task is None:
+            self._task = self.hass.async_create_background_task(
+                self._async_run(), "miner fleet scheduler"
+            )
+
+        @callback
+        def _async_unregister() -> None:
+            self._coordinators.pop(entry_id, None)
+            if not self._coordinators:
+                self.async_stop()
+
+        return _async_unregister
+
+    @callback
+    def async_stop(self, *_) -> None:
+        """Stop the polling loop and the polls still running."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._tasks):
+            task.cancel()
+        self._polling.clear()
+
+    async def _async_run(self) -> None:
+        """Start a poll of every registered coordinator once per interval.
+
+        The cycles keep a fixed cadence from their start and do not wait for
+        their polls.  A miner whose previous poll is still running is skipped,
+        so a hung miner cannot delay the polls of the others.
+        """
+        interval = self.interval.total_seconds()
+        cycle_start = time.monotonic()
+        while True:
+            coordinators = list(self._coordinators.values())
+            self.peak_queue_depth = self.queue_depth
+            spacing = interval / max(len(coordinators), 1)
+            started = []
+            for idx, coordinator in enumerate(coordinators):
+                await _async_sleep_until(cycle_start + idx * spacing)
+                entry_id = coordinator.config_entry.entry_id
+                if entry_id not in self._coordinators:
+                    continue
+                if entry_id in self._polling:
+                    # the previous poll of this miner has not finished yet
+                    self.skipped_polls += 1
+                elif coordinator.poll_due(slack=interval / 2):
+                    started.append(self._async_start_poll(entry_id, coordinator))
+            self.cycles += 1
+            if started:
+                self._async_track_cycle(cycle_start, len(coordinators), started)
+
+            # Only a loop that fell behind by more than a cycle starts late
+            cycle_start = max(cycle_start + interval, time.monotonic())
+            await _async_sleep_until(cycle_start)
+
+    @callback
+    def _async_start_poll(
+        self, entry_id: str, coordinator: MinerCoordinator
+    ) -> asyncio.Task:
+        """Start polling a coordinator in the background."""
+        self._polling.add(entry_id)
+        task = self.hass.async_create_background_task(
+            self._async_poll(entry_id, coordinator),
+            f"miner fleet poll {coordinator.name}",
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    @callback
+    def _async_track_cycle(
+        self, cycle_start: float, miners: int, tasks: list[asyncio.Task]
+    ) -> None:
+        """Record how long the polls started in a cycle took to finish."""
+        remaining = len(tasks)
+
+        @callback
+        def _async_poll_done(_task: asyncio.Task) -> None:
+            nonlocal remaining
+            remaining -= 1
+            if remaining:
+                return
+            self.last_cycle_duration = time.monotonic() - cycle_start
+            _LOGGER.debug(
+                "Fleet poll of %s miners took %.2fs (peak queue depth %s).",
+                miners,
+                self.last_cycle_duration,
+                self.peak_queue_depth,
+            )
+
+        for task in tasks:
+            task.add_done_callback(_async_poll_done)
+
+    async def _async_poll(self, entry_id: str, coordinator: MinerCoordinator) -> None:
+        """Refresh a single coordinator once a polling slot is free."""
+        self.queue_depth += 1
+        self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth)
+        queued = True
+        try:
+            async with self._semaphore:
+                self.queue_depth -= 1
+                queued = False
+                self.in_flight += 1
+                try:
+                    await coordinator.async_refresh()
+                finally:
+                    self.in_flight -= 1
+        finally:
+            if queued:
+                self.queue_depth -= 1
+            self._polling.discard(entry_id)
+
+
+async def _async_sleep_until(when: float) -> None:
+    """Sleep until a point in time of the monotonic clock."""
+    await asyncio.sleep(max(when - time.monotonic(), 0))
@@ -0,0 +1,203 @@
+"""Rolling history of the telemetry of a miner."""
+from __future__ import annotations
+
+import math
+import time
+from array import array
+
+from .perf import nearest_rank_percentile
+from .snapshot import BOARD_SENSORS
+from .snapshot import FAN_SENSORS
+from .snapshot import MinerSnapshot
+
+# Polls kept per miner, one hour at the default scan interval
+DEFAULT_HISTORY_SIZE = 360
+# Seconds covered by the history sensors
+DEFAULT_HISTORY_WINDOW = 3600
+
+HASHRATE = ("miner_sensors", "hashrate")
+CONSUMPTION = ("miner_sensors", "miner_consumption")
+TEMPERATURE = ("miner_sensors", "temperature")
+MINER_SENSORS = ("hashrate", "miner_consumption", "temperature", "efficiency")
+
+
+def history_values(data: MinerSnapshot) -> dict[tuple, float | None]:
+    """Return the values of the coordinator data kept in the history."""
+    miner_sensors = data.miner_sensors
+    values = {
+        ("miner_sensors", sensor): getattr(miner_sensors, sensor)
+        for sensor in MINER_SENSORS
+    }
+    for idx, board in data.board_sensors.items():
+        for sensor in BOARD_SENSORS:
+            values[("board_sensors", idx, sensor)] = getattr(board, sensor)
+    for idx, fan in data.fan_sensors.items():
+        for sensor in FAN_SENSORS:
+            values[("fan_sensors", idx, sensor)] = getattr(fan, sensor)
+    return values
+
+
+def series_name(key: tuple) -> str:
+    """Return the name of a series in service responses."""
+    if key[0] == "board_sensors":
+        return f"board_{key[1]}_{key[2].removeprefix('board_')}"
+    if key[0] == "fan_sensors":
+        return f"fan_{key[1]}_{key[2].removeprefix('fan_')}"
+    return key[1]
+
+
+class RingBuffer:
+    """Fixed size array of floats, the oldest value is overwritten."""
+
+    __slots__ = ("_values", "_size", "_next", "count")
+
+    def __init__(self, size: int, typecode: str = "f") -> None:
+        """Initialize the buffer with missing values."""
+        self._values = array(typecode, [math.nan]) * size
+        self._size = size
+        self._next = 0
+        self.count = 0
+
+    def append(self, value: float) -> None:
+        """Add a value, overwriting the oldest one once the buffer is full."""
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self._size
+        if self.count < self._size:
+            self.count += 1
+
+    def newest(self, count: int) -> array:
+        """Return the newest values, oldest first."""
+        count = min(count, self.count)
+        start = self._next - count
+        if start >= 0:
+            return self._values[start : self._next]
+        return self._values[start:] + self._values[: self._next]
+
+    def count_from(self, threshold: float) -> int:
+        """Return how many of the newest values are at least ``threshold``.
+
+        The values have to be ascending from oldest to newest, like times.
+        """
+        oldest = self._next - self.count
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._values[(oldest + middle) % self._size] < threshold:
+                low = middle + 1
+            else:
+                high = middle
+        return self.count - low
+
+    def align(self, other: RingBuffer) -> None:
+        """Continue at the position of another buffer of the same size."""
+        self._next = other._next
+        self.count = other.count
+
+
+class MinerHistory:
+    """Telemetry of the last polls of a miner, kept in ring buffers.
+
+    All series share the time axis, a value that is missing in a poll is kept
+    as NaN and ignored by the aggregates.
+    """
+
+    __slots__ = ("size", "_times", "_series")
+
+    def __init__(self, size: int = DEFAULT_HISTORY_SIZE) -> None:
+        """Initialize the history."""
+        self.size = size
+        self._times = RingBuffer(size, "d")
+        self._series: dict[tuple, RingBuffer] = {}
+
+    def record(self, data: MinerSnapshot, timestamp: float | None = None) -> None:
+        """Add the values of a successful poll."""
+        values = history_values(data)
+        for key in values.keys() - self._series.keys():
+            buffer = self._series[key] = RingBuffer(self.size)
+            buffer.align(self._times)
+        for key, buffer in self._series.items():
+            value = values.get(key)
+            buffer.append(math.nan if value is None else value)
+        self._times.append(time.monotonic() if timestamp is None else timestamp)
+
+    def samples(self, window: float | None = None, now: float | None = None) -> int:
+        """Return the number of polls within the last ``window`` seconds."""
+        if window is None:
+            return self._times.count
+        now = time.monotonic() if now is None else now
+        return self._times.count_from(now - window)
+
+    def values(
+        self, key: tuple, window: float | None = None, now: float | None = None
+    ) -> list[float]:
+        """Return the known values of a series within the window."""
+        if (buffer := self._series.get(key)) is None:
+            return []
+        values = buffer.newest(self.samples(window, now))
+        # NaN is the only value not equal to itself
+        return [value for value in values if value == value]
+
+    def aggregate(
+        self,
+        key: tuple,
+        stat: str,
+        window: float | None = None,
+        now: float | None = None,
+    ) -> float | None:
+        """Return the mean, min, max or a percentile (p50, p95, ...) of a series."""
+        values = self.values(key, window, now)
+        if not values:
+            return None
+        if stat == "mean":
+            return sum(values) / len(values)
+        if stat == "min":
+            return min(values)
+        if stat == "max":
+            return max(values)
+        return nearest_rank_percentile(sorted(values), float(stat.removeprefix("p")))
+
+    def efficiency(
+        self, window: float | None = None, now: float | None = None
+    ) -> float | None:
+        """Return the energy per hash over the window in J/TH.
+
+        Weighted by uptime, polls without hashrate or consumption are skipped.
+        """
+        count = self.samples(window, now)
+        hashrate = self._series.get(HASHRATE)
+        consumption = self._series.get(CONSUMPTION)
+        if not count or hashrate is None or consumption is None:
+            return None
+        total_hashrate = total_consumption = 0.0
+        for hash_value, power in zip(
+            hashrate.newest(count), consumption.newest(count), strict=True
+        ):
+            if not math.isnan(hash_value) and not math.isnan(power):
+                total_hashrate += hash_value
+                total_consumption += power
+        if not total_hashrate or not total_consumption:
+            return None
+        return total_consumption / total_hashrate
+
+    def summary(self, window: float | None = None, now: float | None = None) -> dict:
+        """Return the statistics of every series within the window."""
+        now = time.monotonic() if now is None else now
+        series = {}
+        for key in sorted(self._series, key=series_name):
+            values = sorted(self.values(key, window, now))
+            if not values:
+                continue
+            series[series_name(key)] = {
+                "count": len(values),
+                "mean": round(sum(values) / len(values), 3),
+                "min": round(values[0], 3),
+                "max": round(values[-1], 3),
+                "p50": round(nearest_rank_percentile(values, 50), 3),
+                "p95": round(nearest_rank_percentile(values, 95), 3),
+            }
+        efficiency = self.efficiency(window, now)
+        return {
+            "samples": self.samples(window, now),
+            "efficiency": None if efficiency is None else round(efficiency, 3),
+            "series": series,
+        }
@@ -0,0 +1,96 @@
+"""Persistent cache of the identity and capabilities of miners."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DATA_IDENTITY
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    import pyasic
+
+    from .snapshot import MinerSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.identity"
+STORAGE_VERSION = 1
+# Seconds to collect changes of many miners into a single write
+SAVE_DELAY = 10
+
+IDENTITY_KEYS = ("make", "model", "fw_ver", "mac", "hostname")
+CAPABILITY_KEYS = (
+    "expected_hashboards",
+    "expected_fans",
+    "supports_autotuning",
+    "supports_shutdown",
+    "supports_power_modes",
+)
+# A change of these means the entities have to be created again
+ENTITY_KEYS = ("make", "model", "fw_ver", "mac", *CAPABILITY_KEYS)
+
+
+def miner_capabilities(miner: pyasic.AnyMiner) -> dict[str, Any]:
+    """Return the capabilities of a detected miner."""
+    return {key: getattr(miner, key) for key in CAPABILITY_KEYS}
+
+
+def miner_identity(miner: pyasic.AnyMiner, data: MinerSnapshot) -> dict[str, Any]:
+    """Return the identity and capabilities of a miner to cache."""
+    return {
+        **{key: getattr(data, key) for key in IDENTITY_KEYS},
+        **miner_capabilities(miner),
+    }
+
+
+def entities_changed(cached: dict[str, Any], identity: dict[str, Any]) -> bool:
+    """Return if entities created from the cached identity are outdated."""
+    return any(cached.get(key) != identity[key] for key in ENTITY_KEYS)
+
+
+class MinerIdentityCache:
+    """Identity and capabilities of every miner, stored in a single file."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self._store: Store[dict[str, dict]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._identities: dict[str, dict] | None = None
+
+    async def async_load(self) -> None:
+        """Load the cache, only the first call reads the file."""
+        if self._identities is None:
+            identities = await self._store.async_load() or {}
+            if self._identities is None:
+                self._identities = identities
+
+    def get(self, entry_id: str) -> dict[str, Any] | None:
+        """Return the cached identity of a config entry."""
+        return self._identities.get(entry_id)
+
+    @callback
+    def async_set(self, entry_id: str, identity: dict[str, Any]) -> None:
+        """Cache the identity of a config entry."""
+        if self._identities.get(entry_id) == identity:
+            return
+        self._identities[entry_id] = identity
+        self._store.async_delay_save(lambda: self._identities, SAVE_DELAY)
+
+    @callback
+    def async_remove(self, entry_id: str) -> None:
+        """Remove the cached identity of a config entry."""
+        if self._identities.pop(entry_id, None) is not None:
+            self._store.async_delay_save(lambda: self._identities, SAVE_DELAY)
+
+
+async def async_get_identity_cache(hass: HomeAssistant) -> MinerIdentityCache:
+    """Return the loaded identity cache."""
+    if (cache := hass.data.get(DATA_IDENTITY)) is None:
+        cache = hass.data[DATA_IDENTITY] = MinerIdentityCache(hass)
+    await cache.async_load()
+    return cache
@@ -2,36 +2,27 @@
 from __future__ import annotations
 
 import logging
-from importlib.metadata import version
 
-from .const import PYASIC_VERSION
-
-try:
-    import pyasic
-
-    if not version("pyasic") == PYASIC_VERSION:
-        raise ImportError
-except ImportError:
-    from .patch import install_package
-
-    install_package(f"pyasic=={PYASIC_VERSION}")
-    import pyasic
-
-from homeassistant.components.number import NumberEntityDescription, NumberDeviceClass
+from homeassistant.components.number import NumberDeviceClass
 from homeassistant.components.number import NumberEntity
+from homeassistant.components.number import NumberEntityDescription
+from homeassistant.components.sensor import EntityCategory
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfPower
 from homeassistant.core import callback
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import device_registry
 from homeassistant.helpers import entity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.components.sensor import EntityCategory
-from homeassistant.const import UnitOfPower
 
+from .bootstrap import import_pyasic
+from .commands import COMMAND_POWER_LIMIT
 from .const import DOMAIN
 from .coordinator import MinerCoordinator
 
+pyasic = import_pyasic()
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -53,8 +44,7 @@ async def async_setup_entry(
     """Add sensors for passed config_entry in HA."""
     coordinator: MinerCoordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    await coordinator.async_config_entry_first_refresh()
-    if coordinator.miner.supports_autotuning:
+    if coordinator.capabilities["supports_autotuning"]:
         async_add_entities(
             [
                 MinerPowerLimitNumber(
@@ -72,8 +62,10 @@ class MinerPowerLimitNumber(CoordinatorEntity[MinerCoordinator], NumberEntity):
         self, coordinator: MinerCoordinator, entity_description: NumberEntityDescription
     ):
         """Initialize the PowerLimit entity."""
-        super().__init__(coordinator=coordinator)
-        self._attr_native_value = self.coordinator.data["miner_sensors"]["power_limit"]
+        super().__init__(
+            coordinator=coordinator, context=("miner_sensors", "power_limit")
+        )
+        self._attr_native_value = self.coordinator.data.miner_sensors.power_limit
         self.entity_description = entity_description
 
     @property
@@ -85,32 +77,32 @@ class MinerPowerLimitNumber(CoordinatorEntity[MinerCoordinator], NumberEntity):
     def device_info(self) -> entity.DeviceInfo:
         """Return device info."""
         return entity.DeviceInfo(
-            identifiers={(DOMAIN, self.coordinator.data["mac"])},
+            identifiers={(DOMAIN, self.coordinator.data.mac)},
             connections={
-                ("ip", self.coordinator.data["ip"]),
-                (device_registry.CONNECTION_NETWORK_MAC, self.coordinator.data["mac"]),
+                ("ip", self.coordinator.data.ip),
+                (device_registry.CONNECTION_NETWORK_MAC, self.coordinator.data.mac),
             },
-            configuration_url=f"http://{self.coordinator.data['ip']}",
-            manufacturer=self.coordinator.data["make"],
-            model=self.coordinator.data["model"],
-            sw_version=self.coordinator.data["fw_ver"],
+            configuration_url=f"http://{self.coordinator.data.ip}",
+            manufacturer=self.coordinator.data.make,
+            model=self.coordinator.data.model,
+            sw_version=self.coordinator.data.fw_ver,
             name=f"{self.coordinator.config_entry.title}",
         )
 
     @property
     def unique_id(self) -> str | None:
         """Return device UUID."""
-        return f"{self.coordinator.data['mac']}-power_limit"
+        return f"{self.coordinator.data.mac}-power_limit"
 
     @property
     def native_min_value(self) -> float | None:
         """Return device minimum value."""
-        return self.coordinator.data["power_limit_range"]["min"]
+        return self.coordinator.data.power_limit_range.min
 
     @property
     def native_max_value(self) -> float | None:
         """Return device maximum value."""
-        return self.coordinator.data["power_limit_range"]["max"]
+        return self.coordinator.data.power_limit_range.max
 
     @property
     def native_step(self) -> float | None:
@@ -136,7 +128,9 @@ class MinerPowerLimitNumber(CoordinatorEntity[MinerCoordinator], NumberEntity):
                 f"{self.coordinator.config_entry.title}: Tuning not supported."
             )
 
-        result = await miner.set_power_limit(int(value))
+        result = await self.coordinator.commands.async_run(
+            COMMAND_POWER_LIMIT, lambda: miner.set_power_limit(int(value))
+        )
 
         if not result:
             raise pyasic.APIError("Failed to set wattage.")
@@ -146,10 +140,8 @@ class MinerPowerLimitNumber(CoordinatorEntity[MinerCoordinator], NumberEntity):
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        if self.coordinator.data["miner_sensors"]["power_limit"] is not None:
-            self._attr_native_value = self.coordinator.data["miner_sensors"][
-                "power_limit"
-            ]
+        if (power_limit := self.coordinator.data.miner_sensors.power_limit) is not None:
+            self._attr_native_value = power_limit
 
         super()._handle_coordinator_update()
 
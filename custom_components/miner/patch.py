@@ -6,6 +6,7 @@ import site
 import sys
 from subprocess import PIPE
 from subprocess import Popen
+from subprocess import TimeoutExpired
 
 from homeassistant.util.package import _LOGGER
 from homeassistant.util.package import is_virtual_env
@@ -23,9 +24,11 @@ def install_package(
     target: str | None = None,
     constraints: str | None = None,
     timeout: int | None = None,
+    install_timeout: float | None = None,
 ) -> bool:
     """Install a package on PyPi. Accepts pip compatible package strings.
 
+    The install is killed after ``install_timeout`` seconds.
     Return boolean if install successful.
     """
     _LOGGER.info("Attempting install of %s", package)
@@ -76,7 +79,15 @@ def install_package(
         env=env,
         close_fds=False,  # required for posix_spawn
     ) as process:
-        _, stderr = process.communicate()
+        try:
+            _, stderr = process.communicate(timeout=install_timeout)
+        except TimeoutExpired:
+            process.kill()
+            process.communicate()
+            _LOGGER.error(
+                "Install of package %s timed out after %ss", package, install_timeout
+            )
+            return False
         if process.returncode != 0:
             _LOGGER.error(
                 "Unable to install package %s: %s",
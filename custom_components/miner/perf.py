@@ -0,0 +1,78 @@
+"""Timing of the update phases of a Miner coordinator."""
+from __future__ import annotations
+
+from collections import deque
+
+PHASE_DETECT = "detect"
+PHASE_FETCH = "fetch"
+PHASE_TRANSFORM = "transform"
+PHASE_ENTITIES = "entities"
+PHASE_UPDATE = "update"
+PHASES = (PHASE_DETECT, PHASE_FETCH, PHASE_TRANSFORM, PHASE_ENTITIES, PHASE_UPDATE)
+
+# Number of samples kept per phase
+DEFAULT_WINDOW = 100
+
+
+def nearest_rank_percentile(samples: list[float], percent: float) -> float:
+    """Return the nearest rank percentile of sorted samples."""
+    return samples[min(int(len(samples) * percent / 100), len(samples) - 1)]
+
+
+class PhaseHistogram:
+    """Rolling window of the durations of a single phase."""
+
+    __slots__ = ("_samples", "count", "last")
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        """Initialize the histogram."""
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.last: float | None = None
+
+    def record(self, duration: float) -> None:
+        """Add the duration of one run of the phase, in seconds."""
+        self._samples.append(duration)
+        self.count += 1
+        self.last = duration
+
+    def percentile(self, percent: float) -> float | None:
+        """Return a percentile of the window in milliseconds."""
+        if not self._samples:
+            return None
+        return round(nearest_rank_percentile(sorted(self._samples), percent) * 1000, 3)
+
+    def summary(self) -> dict:
+        """Return the statistics of the window in milliseconds."""
+        if not self._samples:
+            return {"count": self.count}
+        samples = sorted(self._samples)
+        return {
+            "count": self.count,
+            "last": round(self.last * 1000, 3),
+            "mean": round(sum(samples) / len(samples) * 1000, 3),
+            "p50": round(nearest_rank_percentile(samples, 50) * 1000, 3),
+            "p95": round(nearest_rank_percentile(samples, 95) * 1000, 3),
+            "p99": round(nearest_rank_percentile(samples, 99) * 1000, 3),
+            "max": round(samples[-1] * 1000, 3),
+        }
+
+
+class PerfStats:
+    """Rolling timing histograms of the update phases of one miner.
+
+    Only created when performance statistics are enabled for the entry, the
+    coordinator skips all timing while it is None.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        """Initialize the statistics."""
+        self.phases = {phase: PhaseHistogram(window) for phase in PHASES}
+
+    def record(self, phase: str, duration: float) -> None:
+        """Add the duration of one run of a phase, in seconds."""
+        self.phases[phase].record(duration)
+
+    def summary(self) -> dict:
+        """Return the statistics of all phases."""
+        return {phase: hist.summary() for phase, hist in self.phases.items()}
@@ -2,30 +2,22 @@
 from __future__ import annotations
 
 import logging
-from importlib.metadata import version
-
-from .const import PYASIC_VERSION
-
-try:
-    import pyasic
-
-    if not version("pyasic") == PYASIC_VERSION:
-        raise ImportError
-except ImportError:
-    from .patch import install_package
-
-    install_package(f"pyasic=={PYASIC_VERSION}")
-    import pyasic
+from typing import TYPE_CHECKING
 
 from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import callback
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from pyasic.config.mining import MiningModeHPM, MiningModeLPM, MiningModeNormal
 
-from custom_components.miner import DOMAIN, MinerCoordinator
+from .commands import COMMAND_MINING_MODE
+from .const import DOMAIN
+from .coordinator import MinerCoordinator
+
+if TYPE_CHECKING:
+    import pyasic
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -44,10 +36,9 @@ async def async_setup_entry(
         """Create a sensor entity."""
         created.add(key)
 
-    await coordinator.async_config_entry_first_refresh()
     if (
-        coordinator.miner.supports_power_modes
-        and not coordinator.miner.supports_autotuning
+        coordinator.capabilities["supports_power_modes"]
+        and not coordinator.capabilities["supports_autotuning"]
     ):
         async_add_entities(
             [
@@ -66,8 +57,8 @@ class MinerPowerModeSwitch(CoordinatorEntity[MinerCoordinator], SelectEntity):
         coordinator: MinerCoordinator,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator=coordinator)
-        self._attr_unique_id = f"{self.coordinator.data['mac']}-power-mode"
+        super().__init__(coordinator=coordinator, context=("config",))
+        self._attr_unique_id = f"{self.coordinator.data.mac}-power-mode"
 
     @property
     def name(self) -> str | None:
@@ -78,18 +69,21 @@ class MinerPowerModeSwitch(CoordinatorEntity[MinerCoordinator], SelectEntity):
     def device_info(self) -> entity.DeviceInfo:
         """Return device info."""
         return entity.DeviceInfo(
-            identifiers={(DOMAIN, self.coordinator.data["mac"])},
-            manufacturer=self.coordinator.data["make"],
-            model=self.coordinator.data["model"],
-            sw_version=self.coordinator.data["fw_ver"],
+            identifiers={(DOMAIN, self.coordinator.data.mac)},
+            manufacturer=self.coordinator.data.make,
+            model=self.coordinator.data.model,
+            sw_version=self.coordinator.data.fw_ver,
             name=f"{self.coordinator.config_entry.title}",
         )
 
     @property
     def current_option(self) -> str | None:
         """The current option selected with the select."""
-        config: pyasic.MinerConfig = self.coordinator.data["config"]
-        return str(config.mining_mode.mode).title()
+        config: pyasic.MinerConfig = self.coordinator.data.config
+        try:
+            return str(config.mining_mode.mode).title()
+        except AttributeError:
+            return None
 
     @property
     def options(self) -> list[str]:
@@ -98,11 +92,25 @@ class MinerPowerModeSwitch(CoordinatorEntity[MinerCoordinator], SelectEntity):
 
     async def async_select_option(self, option: str) -> None:
         """Change the selected option."""
+        from pyasic.config.mining import MiningModeHPM
+        from pyasic.config.mining import MiningModeLPM
+        from pyasic.config.mining import MiningModeNormal
+
         option_map = {
             "High": MiningModeHPM,
             "Normal": MiningModeNormal,
             "Low": MiningModeLPM,
         }
-        cfg = await self.coordinator.miner.get_config()
-        cfg.mining_mode = option_map[option]()
-        await self.coordinator.miner.send_config(cfg)
+
+        def set_mining_mode(cfg: pyasic.MinerConfig) -> None:
+            cfg.mining_mode = option_map[option]()
+
+        await self.coordinator.commands.async_run(
+            COMMAND_MINING_MODE,
+            lambda: self.coordinator.async_update_config(set_mining_mode),
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available or not."""
+        return self.coordinator.available
@@ -12,16 +12,29 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import REVOLUTIONS_PER_MINUTE
 from homeassistant.const import UnitOfPower
 from homeassistant.const import UnitOfTemperature
+from homeassistant.const import UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity
+from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .aggregate import FleetAggregator
+from .aggregate import get_fleet_aggregator
 from .const import DOMAIN
+from .const import FLEET_NAME
+from .const import FLEET_UNIQUE_ID
 from .const import JOULES_PER_TERA_HASH
 from .const import TERA_HASH_PER_SECOND
 from .coordinator import MinerCoordinator
+from .history import CONSUMPTION
+from .history import DEFAULT_HISTORY_WINDOW
+from .history import HASHRATE
+from .history import TEMPERATURE
+from .perf import PHASES
+from .snapshot import MINER_SENSORS
+from .snapshot import snapshot_reader
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -102,6 +115,81 @@ ENTITY_DESCRIPTION_KEY_MAP: dict[str, SensorEntityDescription] = {
     ),
 }
 
+HISTORY_DESCRIPTION_KEY_MAP: dict[str, SensorEntityDescription] = {
+    "average_hashrate": SensorEntityDescription(
+        key="Average Hashrate",
+        native_unit_of_measurement=TERA_HASH_PER_SECOND,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    "average_consumption": SensorEntityDescription(
+        key="Average Consumption",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    "peak_temperature": SensorEntityDescription(
+        key="Peak Temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        suggested_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    "average_efficiency": SensorEntityDescription(
+        key="Average Efficiency",
+        native_unit_of_measurement=JOULES_PER_TERA_HASH,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+}
+
+# Series and statistic of the history sensors, the efficiency is weighted
+HISTORY_AGGREGATES: dict[str, tuple[tuple, str]] = {
+    "average_hashrate": (HASHRATE, "mean"),
+    "average_consumption": (CONSUMPTION, "mean"),
+    "peak_temperature": (TEMPERATURE, "max"),
+}
+
+FLEET_DESCRIPTION_KEY_MAP: dict[str, SensorEntityDescription] = {
+    "total_hashrate": SensorEntityDescription(
+        key="Total Hashrate",
+        native_unit_of_measurement=TERA_HASH_PER_SECOND,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    "total_consumption": SensorEntityDescription(
+        key="Total Consumption",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+    ),
+    "efficiency": SensorEntityDescription(
+        key="Efficiency",
+        native_unit_of_measurement=JOULES_PER_TERA_HASH,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    "miners": SensorEntityDescription(
+        key="Miners",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    "miners_online": SensorEntityDescription(
+        key="Miners Online",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    "miners_mining": SensorEntityDescription(
+        key="Miners Mining",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    "max_chip_temperature": SensorEntityDescription(
+        key="Max Chip Temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        suggested_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+    ),
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -109,6 +197,14 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Add sensors for passed config_entry in HA."""
+    if config_entry.unique_id == FLEET_UNIQUE_ID:
+        aggregator = get_fleet_aggregator(hass)
+        async_add_entities(
+            FleetSensor(aggregator=aggregator, sensor=s, entity_description=description)
+            for s, description in FLEET_DESCRIPTION_KEY_MAP.items()
+        )
+        return
+
     coordinator: MinerCoordinator = hass.data[DOMAIN][config_entry.entry_id]
 
     def _create_miner_entity(sensor: str) -> MinerSensor:
@@ -146,17 +242,24 @@ async def async_setup_entry(
             entity_description=description,
         )
 
-    await coordinator.async_config_entry_first_refresh()
-
     sensors = []
-    for s in coordinator.data["miner_sensors"]:
+    for s in MINER_SENSORS:
         sensors.append(_create_miner_entity(s))
-    for board in range(coordinator.miner.expected_hashboards or 3):
+    for board in range(coordinator.capabilities["expected_hashboards"] or 3):
         for s in ["board_temperature", "chip_temperature", "board_hashrate"]:
             sensors.append(_create_board_entity(board, s))
-    for fan in range(coordinator.miner.expected_fans or 4):
+    for fan in range(coordinator.capabilities["expected_fans"] or 4):
         for s in ["fan_speed"]:
             sensors.append(_create_fan_entity(fan, s))
+    for s, description in HISTORY_DESCRIPTION_KEY_MAP.items():
+        sensors.append(
+            MinerHistorySensor(
+                coordinator=coordinator, sensor=s, entity_description=description
+            )
+        )
+    if coordinator.perf is not None:
+        for phase in PHASES:
+            sensors.append(MinerPerfSensor(coordinator=coordinator, phase=phase))
     async_add_entities(sensors)
 
 
@@ -172,18 +275,17 @@ class MinerSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
         entity_description: SensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator=coordinator)
-        self._attr_unique_id = f"{self.coordinator.data['mac']}-{sensor}"
+        context = ("miner_sensors", sensor)
+        super().__init__(coordinator=coordinator, context=context)
+        self._attr_unique_id = f"{self.coordinator.data.mac}-{sensor}"
         self._sensor = sensor
+        self._read = snapshot_reader(context)
         self.entity_description = entity_description
 
     @property
     def _sensor_data(self):
         """Return sensor data."""
-        try:
-            return self.coordinator.data["miner_sensors"][self._sensor]
-        except LookupError:
-            return None
+        return self._read(self.coordinator.data)
 
     @property
     def name(self) -> str | None:
@@ -194,10 +296,10 @@ class MinerSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
     def device_info(self) -> entity.DeviceInfo:
         """Return device info."""
         return entity.DeviceInfo(
-            identifiers={(DOMAIN, self.coordinator.data["mac"])},
-            manufacturer=self.coordinator.data["make"],
-            model=self.coordinator.data["model"],
-            sw_version=self.coordinator.data["fw_ver"],
+            identifiers={(DOMAIN, self.coordinator.data.mac)},
+            manufacturer=self.coordinator.data.make,
+            model=self.coordinator.data.model,
+            sw_version=self.coordinator.data.fw_ver,
             name=f"{self.coordinator.config_entry.title}",
         )
 
@@ -225,19 +327,18 @@ class MinerBoardSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
         entity_description: SensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator=coordinator)
-        self._attr_unique_id = f"{self.coordinator.data['mac']}-{board_num}-{sensor}"
+        context = ("board_sensors", board_num, sensor)
+        super().__init__(coordinator=coordinator, context=context)
+        self._attr_unique_id = f"{self.coordinator.data.mac}-{board_num}-{sensor}"
         self._board_num = board_num
         self._sensor = sensor
+        self._read = snapshot_reader(context)
         self.entity_description = entity_description
 
     @property
     def _sensor_data(self):
         """Return sensor data."""
-        try:
-            return self.coordinator.data["board_sensors"][self._board_num][self._sensor]
-        except LookupError:
-            return None
+        return self._read(self.coordinator.data)
 
     @property
     def name(self) -> str | None:
@@ -248,10 +349,10 @@ class MinerBoardSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
     def device_info(self) -> entity.DeviceInfo:
         """Return device info."""
         return entity.DeviceInfo(
-            identifiers={(DOMAIN, self.coordinator.data["mac"])},
-            manufacturer=self.coordinator.data["make"],
-            model=self.coordinator.data["model"],
-            sw_version=self.coordinator.data["fw_ver"],
+            identifiers={(DOMAIN, self.coordinator.data.mac)},
+            manufacturer=self.coordinator.data.make,
+            model=self.coordinator.data.model,
+            sw_version=self.coordinator.data.fw_ver,
             name=f"{self.coordinator.config_entry.title}",
         )
 
@@ -279,20 +380,18 @@ class MinerFanSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
         entity_description: SensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator=coordinator)
-        self._attr_unique_id = f"{self.coordinator.data['mac']}-{fan_num}-{sensor}"
+        context = ("fan_sensors", fan_num, sensor)
+        super().__init__(coordinator=coordinator, context=context)
+        self._attr_unique_id = f"{self.coordinator.data.mac}-{fan_num}-{sensor}"
         self._fan_num = fan_num
         self._sensor = sensor
+        self._read = snapshot_reader(context)
         self.entity_description = entity_description
-        self._attr_force_update = True
 
     @property
     def _sensor_data(self):
         """Return sensor data."""
-        try:
-            return self.coordinator.data["fan_sensors"][self._fan_num][self._sensor]
-        except LookupError:
-            return None
+        return self._read(self.coordinator.data)
 
     @property
     def name(self) -> str | None:
@@ -303,10 +402,10 @@ class MinerFanSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
     def device_info(self) -> entity.DeviceInfo:
         """Return device info."""
         return entity.DeviceInfo(
-            identifiers={(DOMAIN, self.coordinator.data["mac"])},
-            manufacturer=self.coordinator.data["make"],
-            model=self.coordinator.data["model"],
-            sw_version=self.coordinator.data["fw_ver"],
+            identifiers={(DOMAIN, self.coordinator.data.mac)},
+            manufacturer=self.coordinator.data.make,
+            model=self.coordinator.data.model,
+            sw_version=self.coordinator.data.fw_ver,
             name=f"{self.coordinator.config_entry.title}",
         )
 
@@ -319,3 +418,149 @@ class MinerFanSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
     def available(self) -> bool:
         """Return if entity is available or not."""
         return self.coordinator.available
+
+
+class MinerHistorySensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
+    """Defines a sensor aggregating the recent history of a miner."""
+
+    entity_description: SensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: MinerCoordinator,
+        sensor: str,
+        entity_description: SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator=coordinator)
+        self._attr_unique_id = f"{self.coordinator.data.mac}-{sensor}"
+        self._sensor = sensor
+        self.entity_description = entity_description
+
+    @property
+    def name(self) -> str | None:
+        """Return name of the entity."""
+        return f"{self.coordinator.config_entry.title} {self.entity_description.key}"
+
+    @property
+    def device_info(self) -> entity.DeviceInfo:
+        """Return device info."""
+        return entity.DeviceInfo(
+            identifiers={(DOMAIN, self.coordinator.data.mac)},
+            manufacturer=self.coordinator.data.make,
+            model=self.coordinator.data.model,
+            sw_version=self.coordinator.data.fw_ver,
+            name=f"{self.coordinator.config_entry.title}",
+        )
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the aggregate over the history window."""
+        history = self.coordinator.history
+        if self._sensor == "average_efficiency":
+            value = history.efficiency(DEFAULT_HISTORY_WINDOW)
+        else:
+            key, stat = HISTORY_AGGREGATES[self._sensor]
+            value = history.aggregate(key, stat, DEFAULT_HISTORY_WINDOW)
+        return None if value is None else round(value, 2)
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the window the value covers."""
+        return {
+            "window": DEFAULT_HISTORY_WINDOW,
+            "samples": self.coordinator.history.samples(DEFAULT_HISTORY_WINDOW),
+        }
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available or not."""
+        return self.coordinator.available
+
+
+class MinerPerfSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
+    """Defines a sensor with the p95 duration of an update phase."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator: MinerCoordinator, phase: str) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator=coordinator)
+        self._attr_unique_id = f"{self.coordinator.data.mac}-perf-{phase}"
+        self._phase = phase
+
+    @property
+    def name(self) -> str | None:
+        """Return name of the entity."""
+        return f"{self.coordinator.config_entry.title} {self._phase.capitalize()} Time"
+
+    @property
+    def device_info(self) -> entity.DeviceInfo:
+        """Return device info."""
+        return entity.DeviceInfo(
+            identifiers={(DOMAIN, self.coordinator.data.mac)},
+            manufacturer=self.coordinator.data.make,
+            model=self.coordinator.data.model,
+            sw_version=self.coordinator.data.fw_ver,
+            name=f"{self.coordinator.config_entry.title}",
+        )
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the p95 duration of the phase."""
+        return self.coordinator.perf.phases[self._phase].percentile(95)
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the full statistics of the phase."""
+        return self.coordinator.perf.phases[self._phase].summary()
+
+
+class FleetSensor(SensorEntity):
+    """Defines a sensor with a total over all miners."""
+
+    entity_description: SensorEntityDescription
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        aggregator: FleetAggregator,
+        sensor: str,
+        entity_description: SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self._aggregator = aggregator
+        self._attr_unique_id = f"fleet-{sensor}"
+        self._sensor = sensor
+        self.entity_description = entity_description
+
+    async def async_added_to_hass(self) -> None:
+        """Update the sensor when the totals change."""
+        self.async_on_remove(
+            self._aggregator.async_add_listener(self.async_write_ha_state)
+        )
+
+    @property
+    def name(self) -> str | None:
+        """Return name of the entity."""
+        return f"{FLEET_NAME} {self.entity_description.key}"
+
+    @property
+    def device_info(self) -> entity.DeviceInfo:
+        """Return device info."""
+        return entity.DeviceInfo(
+            identifiers={(DOMAIN, FLEET_UNIQUE_ID)},
+            name=FLEET_NAME,
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the total."""
+        value = getattr(self._aggregator, self._sensor)
+        if isinstance(value, float):
+            return round(value, 2)
+        return value
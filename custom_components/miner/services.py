@@ -1,90 +1,297 @@
 """The Miner component services."""
 from __future__ import annotations
 
-import asyncio
 import logging
-from importlib.metadata import version
+from collections.abc import Callable
+from typing import TYPE_CHECKING
 
+import voluptuous as vol
 from homeassistant.const import CONF_DEVICE_ID
+from homeassistant.const import CONF_TIMEOUT
 from homeassistant.core import HomeAssistant
 from homeassistant.core import ServiceCall
+from homeassistant.core import ServiceResponse
+from homeassistant.core import SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.device_registry import (
+    async_entries_for_config_entry,
+)
 from homeassistant.helpers.device_registry import (
     async_get as async_get_device_registry,
 )
 
+from .batch import async_run_batch
+from .batch import MinerAction
+from .commands import COMMAND_MINING_MODE
+from .commands import COMMAND_REBOOT
+from .commands import COMMAND_RESTART_BACKEND
+from .const import CONF_IP
+from .const import CONF_MAX_CONCURRENT
+from .const import DATA_FLEET
+from .const import DEFAULT_BATCH_MAX_CONCURRENT
+from .const import DEFAULT_BATCH_TIMEOUT
+from .const import DEFAULT_CURTAIL_WAVE_INTERVAL
+from .const import DEFAULT_CURTAIL_WAVE_SIZE
 from .const import DOMAIN
-from .const import PYASIC_VERSION
+from .const import SERVICE_CURTAIL_FLEET
+from .const import SERVICE_GET_HISTORY
+from .const import SERVICE_GET_PERF_STATS
 from .const import SERVICE_REBOOT
 from .const import SERVICE_RESTART_BACKEND
 from .const import SERVICE_SET_WORK_MODE
+from .curtail import async_apply_curtailment
+from .curtail import fleet_consumption
+from .curtail import miner_load
+from .curtail import plan_curtailment
+from .history import DEFAULT_HISTORY_WINDOW
 
-# Ensure the expected pyasic version is available, importing MiningModeConfig
-try:
-    if version("pyasic") != PYASIC_VERSION:
-        raise ImportError
-    from pyasic.config.mining import MiningModeConfig  # type: ignore
-except Exception:  # pragma: no cover - handled by dynamic install
-    from .patch import install_package
-
-    install_package(f"pyasic=={PYASIC_VERSION}")
-    from pyasic.config.mining import MiningModeConfig  # type: ignore
+if TYPE_CHECKING:
+    from .coordinator import MinerCoordinator
 
 LOGGER = logging.getLogger(__name__)
 
+BATCH_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_DEVICE_ID): vol.Any(cv.string, [cv.string]),
+        vol.Optional(
+            CONF_MAX_CONCURRENT, default=DEFAULT_BATCH_MAX_CONCURRENT
+        ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+        vol.Optional(CONF_TIMEOUT, default=DEFAULT_BATCH_TIMEOUT): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+    }
+)
+
+SET_WORK_MODE_SCHEMA = BATCH_SCHEMA.extend(
+    {vol.Required("mode"): vol.In(["low", "normal", "high"])}
+)
+
+CURTAIL_FLEET_SCHEMA = vol.Schema(
+    {
+        vol.Required("target_wattage"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_DEVICE_ID): vol.Any(cv.string, [cv.string]),
+        vol.Optional("allow_pause", default=True): cv.boolean,
+        vol.Optional("dry_run", default=False): cv.boolean,
+        vol.Optional("wave_size", default=DEFAULT_CURTAIL_WAVE_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=1000)
+        ),
+        vol.Optional("wave_interval", default=DEFAULT_CURTAIL_WAVE_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=600)
+        ),
+        vol.Optional(CONF_TIMEOUT, default=DEFAULT_BATCH_TIMEOUT): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+    }
+)
+
+GET_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_DEVICE_ID): vol.Any(cv.string, [cv.string]),
+        vol.Optional("window", default=DEFAULT_HISTORY_WINDOW): vol.All(
+            vol.Coerce(float), vol.Range(min=1)
+        ),
+    }
+)
+
 
 async def async_setup_services(hass: HomeAssistant) -> None:
     """Service handler setup."""
 
-    async def get_miners(call: ServiceCall):
+    def get_targets(call: ServiceCall) -> list[tuple[str, MinerCoordinator]]:
         hass_devices = hass.data[DOMAIN]
 
         miner_ids = call.data[CONF_DEVICE_ID]
 
         if not miner_ids:
-            return
+            return []
+        if isinstance(miner_ids, str):
+            miner_ids = [miner_ids]
 
         registry = async_get_device_registry(hass)
 
-        return await asyncio.gather(
-            *(
-                [
-                    hass_devices[registry.async_get(d).primary_config_entry].get_miner()
-                    for d in miner_ids
-                ]
+        targets = []
+        for device_id in miner_ids:
+            device = registry.async_get(device_id)
+            if (
+                device is None
+                or (coordinator := hass_devices.get(device.primary_config_entry))
+                is None
+            ):
+                # e.g. the fleet device, it has no miner to send commands to
+                raise HomeAssistantError(f"Device {device_id} is not a miner.")
+            targets.append((device_id, coordinator))
+        return targets
+
+    def get_coordinators(call: ServiceCall) -> list[MinerCoordinator]:
+        return [coordinator for _, coordinator in get_targets(call)]
+
+    async def run_batch(call: ServiceCall, action: MinerAction) -> ServiceResponse:
+        results = await async_run_batch(
+            get_targets(call),
+            action,
+            max_concurrent=call.data[CONF_MAX_CONCURRENT],
+            timeout=call.data[CONF_TIMEOUT],
+        )
+        failed = [result["name"] for result in results if not result["success"]]
+        if call.return_response:
+            return {
+                "succeeded": len(results) - len(failed),
+                "failed": len(failed),
+                "results": results,
+            }
+        if failed:
+            raise HomeAssistantError(
+                f"{call.service} failed on {len(failed)} of {len(results)} "
+                f"miners: {', '.join(failed)}"
             )
+        return None
+
+    def register_batch_service(
+        service: str, handler: Callable, schema: vol.Schema = BATCH_SCHEMA
+    ) -> None:
+        hass.services.async_register(
+            DOMAIN,
+            service,
+            handler,
+            schema=schema,
+            supports_response=SupportsResponse.OPTIONAL,
         )
 
-    async def reboot(call: ServiceCall) -> None:
-        miners = await get_miners(call)
-        if len(miners) > 0:
-            await asyncio.gather(*[miner.reboot() for miner in miners])
+    async def reboot(call: ServiceCall) -> ServiceResponse:
+        async def _reboot(coordinator, miner):
+            await coordinator.commands.async_run(COMMAND_REBOOT, miner.reboot)
 
-    hass.services.async_register(DOMAIN, SERVICE_REBOOT, reboot)
+        return await run_batch(call, _reboot)
 
-    async def restart_backend(call: ServiceCall) -> None:
-        miners = await get_miners(call)
-        if len(miners) > 0:
-            await asyncio.gather(*[miner.restart_backend() for miner in miners])
+    register_batch_service(SERVICE_REBOOT, reboot)
 
-    hass.services.async_register(DOMAIN, SERVICE_RESTART_BACKEND, restart_backend)
+    async def restart_backend(call: ServiceCall) -> ServiceResponse:
+        async def _restart_backend(coordinator, miner):
+            await coordinator.commands.async_run(
+                COMMAND_RESTART_BACKEND, miner.restart_backend
+            )
+
+        return await run_batch(call, _restart_backend)
+
+    register_batch_service(SERVICE_RESTART_BACKEND, restart_backend)
+
+    async def set_work_mode(call: ServiceCall) -> ServiceResponse:
+        from pyasic.config.mining import MiningModeConfig
+
+        mode = call.data["mode"]
+
+        def update_mining_mode(cfg):
+            cfg_mode = MiningModeConfig.default()
+            if mode == "high":
+                cfg_mode = MiningModeConfig.high()
+            elif mode == "normal":
+                cfg_mode = MiningModeConfig.normal()
+            elif mode == "low":
+                cfg_mode = MiningModeConfig.low()
+            cfg.mining_mode = cfg_mode
+
+        async def set_mining_mode(coordinator, miner):
+            await coordinator.commands.async_run(
+                COMMAND_MINING_MODE,
+                lambda: coordinator.async_update_config(update_mining_mode),
+            )
+
+        return await run_batch(call, set_mining_mode)
+
+    register_batch_service(SERVICE_SET_WORK_MODE, set_work_mode, SET_WORK_MODE_SCHEMA)
+
+    async def get_perf_stats(call: ServiceCall) -> ServiceResponse:
+        if call.data.get(CONF_DEVICE_ID):
+            coordinators = get_coordinators(call)
+        else:
+            coordinators = list(hass.data[DOMAIN].values())
+        fleet = hass.data.get(DATA_FLEET)
+        return {
+            "fleet": fleet.stats if fleet is not None else None,
+            "miners": [coordinator.perf_stats() for coordinator in coordinators],
+        }
+
+    async def curtail_fleet(call: ServiceCall) -> ServiceResponse:
+        if call.data.get(CONF_DEVICE_ID):
+            targets = dict(get_targets(call))
+        else:
+            registry = async_get_device_registry(hass)
+            targets = {}
+            for entry_id, coordinator in hass.data[DOMAIN].items():
+                devices = async_entries_for_config_entry(registry, entry_id)
+                targets[devices[0].id if devices else entry_id] = coordinator
+
+        target = call.data["target_wattage"]
+        loads = [
+            load
+            for device_id, coordinator in targets.items()
+            if (load := miner_load(device_id, coordinator)) is not None
+        ]
+        actions = plan_curtailment(loads, target, call.data["allow_pause"])
+        response = {
+            "target_wattage": target,
+            "initial_consumption": fleet_consumption(targets.values()),
+            "planned_consumption": fleet_consumption(targets.values())
+            - sum(
+                action.miner.consumption - action.expected_consumption
+                for action in actions
+            ),
+            "plan": [action.as_dict() for action in actions],
+            "waves": [],
+        }
+        if not call.data["dry_run"]:
+            response["waves"] = await async_apply_curtailment(
+                targets,
+                actions,
+                target,
+                wave_size=call.data["wave_size"],
+                wave_interval=call.data["wave_interval"],
+                timeout=call.data[CONF_TIMEOUT],
+            )
+        response["final_consumption"] = fleet_consumption(targets.values())
+
+        if call.return_response:
+            return response
+        failed = sum(wave["failed"] for wave in response["waves"])
+        if failed:
+            raise HomeAssistantError(
+                f"{call.service} failed on {failed} miners, fleet consumption is "
+                f"{response['final_consumption']}W"
+            )
+        return None
 
-    async def set_work_mode(call: ServiceCall) -> None:
-        miners = await get_miners(call)
-        if len(miners) > 0:
-            mode = call.data["mode"]
+    register_batch_service(SERVICE_CURTAIL_FLEET, curtail_fleet, CURTAIL_FLEET_SCHEMA)
 
-            async def set_mining_mode(miner):
-                cfg_mode = MiningModeConfig.default()
-                if mode == "high":
-                    cfg_mode = MiningModeConfig.high()
-                elif mode == "normal":
-                    cfg_mode = MiningModeConfig.normal()
-                elif mode == "low":
-                    cfg_mode = MiningModeConfig.low()
-                cfg = await miner.get_config()
-                cfg.mining_mode = cfg_mode
-                await miner.send_config(cfg)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_PERF_STATS,
+        get_perf_stats,
+        supports_response=SupportsResponse.ONLY,
+    )
 
-            await asyncio.gather(*(set_mining_mode(miner) for miner in miners))
+    async def get_history(call: ServiceCall) -> ServiceResponse:
+        if call.data.get(CONF_DEVICE_ID):
+            coordinators = get_coordinators(call)
+        else:
+            coordinators = list(hass.data[DOMAIN].values())
+        window = call.data["window"]
+        return {
+            "window": window,
+            "miners": [
+                {
+                    "name": coordinator.config_entry.title,
+                    "ip": coordinator.config_entry.data[CONF_IP],
+                    **coordinator.history.summary(window),
+                }
+                for coordinator in coordinators
+            ],
+        }
 
-    hass.services.async_register(DOMAIN, SERVICE_SET_WORK_MODE, set_work_mode)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
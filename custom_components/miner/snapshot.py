@@ -0,0 +1,107 @@
+"""Typed snapshot of the data of a miner, built once per poll."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from dataclasses import field
+from dataclasses import fields
+from operator import attrgetter
+from typing import Any
+
+# Top level data that every entity depends on
+DEVICE_DATA_KEYS = ("hostname", "mac", "make", "model", "ip", "fw_ver")
+
+
+@dataclass(slots=True)
+class MinerSensors:
+    """Values of the miner sensors."""
+
+    hashrate: float | None = 0
+    ideal_hashrate: float | None = 0
+    active_preset_name: str | None = None
+    temperature: float | None = 0
+    power_limit: int | None = 0
+    miner_consumption: int | None = 0
+    efficiency: float | None = 0.0
+
+
+@dataclass(slots=True)
+class BoardSensors:
+    """Values of the sensors of one hashboard."""
+
+    board_temperature: float | None
+    chip_temperature: float | None
+    board_hashrate: float
+
+
+@dataclass(slots=True)
+class FanSensors:
+    """Values of the sensors of one fan."""
+
+    fan_speed: int | None
+
+
+@dataclass(slots=True)
+class PowerLimitRange:
+    """Range the power limit can be set in."""
+
+    min: int
+    max: int
+
+
+@dataclass(slots=True)
+class MinerSnapshot:
+    """Data of a miner, the defaults are the data of an offline miner."""
+
+    power_limit_range: PowerLimitRange
+    hostname: str | None = None
+    mac: str | None = None
+    make: str | None = None
+    model: str | None = None
+    ip: str | None = None
+    is_mining: bool | None = False
+    fw_ver: str | None = None
+    miner_sensors: MinerSensors = field(default_factory=MinerSensors)
+    board_sensors: dict[int, BoardSensors] = field(default_factory=dict)
+    fan_sensors: dict[int, FanSensors] = field(default_factory=dict)
+    config: Any = None
+
+
+MINER_SENSORS = tuple(sensor.name for sensor in fields(MinerSensors))
+BOARD_SENSORS = tuple(sensor.name for sensor in fields(BoardSensors))
+FAN_SENSORS = tuple(sensor.name for sensor in fields(FanSensors))
+_TOP_LEVEL_KEYS = (*DEVICE_DATA_KEYS, "is_mining", "config", "power_limit_range")
+
+
+def snapshot_values(data: MinerSnapshot) -> dict[tuple, Any]:
+    """Flatten a snapshot to values keyed by their entity context."""
+    values = {(key,): getattr(data, key) for key in _TOP_LEVEL_KEYS}
+    miner_sensors = data.miner_sensors
+    for sensor in MINER_SENSORS:
+        values[("miner_sensors", sensor)] = getattr(miner_sensors, sensor)
+    for idx, board in data.board_sensors.items():
+        for sensor in BOARD_SENSORS:
+            values[("board_sensors", idx, sensor)] = getattr(board, sensor)
+    for idx, fan in data.fan_sensors.items():
+        for sensor in FAN_SENSORS:
+            values[("fan_sensors", idx, sensor)] = getattr(fan, sensor)
+    return values
+
+
+def snapshot_reader(context: tuple) -> Callable[[MinerSnapshot], Any]:
+    """Return a function reading the value of an entity context from a snapshot.
+
+    Entities create it once, so reading their state needs no key lookups.
+    """
+    if context[0] == "miner_sensors":
+        return attrgetter(f"miner_sensors.{context[1]}")
+    if context[0] in ("board_sensors", "fan_sensors"):
+        table = attrgetter(context[0])
+        _, idx, sensor = context
+
+        def _read(data: MinerSnapshot) -> Any:
+            # A board or fan that is gone reads as None
+            return getattr(table(data).get(idx), sensor, None)
+
+        return _read
+    return attrgetter(context[0])
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from typing import TYPE_CHECKING
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
@@ -11,9 +12,13 @@ from homeassistant.helpers import entity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .commands import COMMAND_MINING
 from .const import DOMAIN
 from .coordinator import MinerCoordinator
 
+if TYPE_CHECKING:
+    import pyasic
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -31,8 +36,7 @@ async def async_setup_entry(
         """Create a sensor entity."""
         created.add(key)
 
-    await coordinator.async_config_entry_first_refresh()
-    if coordinator.miner.supports_shutdown:
+    if coordinator.capabilities["supports_shutdown"]:
         async_add_entities(
             [
                 MinerActiveSwitch(
@@ -50,9 +54,9 @@ class MinerActiveSwitch(CoordinatorEntity[MinerCoordinator], SwitchEntity):
         coordinator: MinerCoordinator,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator=coordinator)
-        self._attr_unique_id = f"{self.coordinator.data['mac']}-active"
-        self._attr_is_on = self.coordinator.data["is_mining"]
+        super().__init__(coordinator=coordinator, context=("is_mining",))
+        self._attr_unique_id = f"{self.coordinator.data.mac}-active"
+        self._attr_is_on = self.coordinator.data.is_mining
         self.updating_switch = False
         self._last_mining_mode = None
 
@@ -65,10 +69,10 @@ class MinerActiveSwitch(CoordinatorEntity[MinerCoordinator], SwitchEntity):
     def device_info(self) -> entity.DeviceInfo:
         """Return device info."""
         return entity.DeviceInfo(
-            identifiers={(DOMAIN, self.coordinator.data["mac"])},
-            manufacturer=self.coordinator.data["make"],
-            model=self.coordinator.data["model"],
-            sw_version=self.coordinator.data["fw_ver"],
+            identifiers={(DOMAIN, self.coordinator.data.mac)},
+            manufacturer=self.coordinator.data.make,
+            model=self.coordinator.data.model,
+            sw_version=self.coordinator.data.fw_ver,
             name=f"{self.coordinator.config_entry.title}",
         )
 
@@ -79,13 +83,20 @@ class MinerActiveSwitch(CoordinatorEntity[MinerCoordinator], SwitchEntity):
         if not miner.supports_shutdown:
             raise TypeError(f"{miner}: Shutdown not supported.")
         self._attr_is_on = True
-        await miner.resume_mining()
-        if miner.supports_power_modes:
-            config = await miner.get_config()
-            config.mining_mode = self._last_mining_mode
-            await miner.send_config(config)
+
+        async def resume_mining() -> None:
+            mining_mode = self._last_mining_mode
+
+            def restore_mining_mode(config: pyasic.MinerConfig) -> None:
+                config.mining_mode = mining_mode
+
+            await miner.resume_mining()
+            if miner.supports_power_modes and mining_mode is not None:
+                await self.coordinator.async_update_config(restore_mining_mode)
+
         self.updating_switch = True
         self.async_write_ha_state()
+        await self.coordinator.commands.async_run(COMMAND_MINING, resume_mining)
 
     async def async_turn_off(self) -> None:
         """Turn off miner."""
@@ -93,16 +104,30 @@ class MinerActiveSwitch(CoordinatorEntity[MinerCoordinator], SwitchEntity):
         _LOGGER.debug(f"{self.coordinator.config_entry.title}: Stop mining.")
         if not miner.supports_shutdown:
             raise TypeError(f"{miner}: Shutdown not supported.")
-        if miner.supports_power_modes:
-            self._last_mining_mode = self.coordinator.data["config"].mining_mode
         self._attr_is_on = False
-        await miner.stop_mining()
+
+        async def stop_mining() -> None:
+            if miner.supports_power_modes:
+                # The config is only polled while the power mode select is
+                # enabled, read the mode to restore once right before pausing
+                try:
+                    config = await miner.get_config()
+                except Exception as err:  # pausing matters more than the mode
+                    _LOGGER.warning(
+                        f"{self.coordinator.config_entry.title}: "
+                        f"could not read the mining mode: {err}"
+                    )
+                else:
+                    self._last_mining_mode = config.mining_mode
+            await miner.stop_mining()
+
         self.updating_switch = True
         self.async_write_ha_state()
+        await self.coordinator.commands.async_run(COMMAND_MINING, stop_mining)
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        is_mining = self.coordinator.data["is_mining"]
+        is_mining = self.coordinator.data.is_mining
         if is_mining is not None:
             if self.updating_switch:
                 if is_mining == self._attr_is_on:
@@ -0,0 +1,188 @@
+"""Long-lived HTTP connections to miners, shared by the pyasic web clients."""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from contextlib import suppress
+from typing import Any
+
+import httpx
+
+from .bootstrap import import_pyasic
+
+settings = import_pyasic().settings
+
+_LOGGER = logging.getLogger(__name__)
+
+# Idle keep-alive connections kept open to each miner
+TRANSPORT_MAX_IDLE = 2
+# Seconds an idle connection is kept open, longer than the scan interval
+TRANSPORT_IDLE_TIMEOUT = 60
+# Seconds before its expiry a web token is replaced by a new login
+TOKEN_EXPIRY_MARGIN = 30
+
+_transports: dict[str, MinerTransport] = {}
+# Pools of all loaded entries, also those replaced by an entry of the same host
+_registered: set[MinerTransport] = set()
+_default_transport = settings.transport
+
+
+class MinerTransport(httpx.AsyncBaseTransport):
+    """Connection pool to a single miner that outlives the pyasic clients.
+
+    pyasic opens a new HTTP client for every web command and closes it with
+    its transport afterwards.  Requests to a registered miner are sent through
+    this pool instead, so the connections stay open between polls.
+
+    The last digest challenge of the miner is kept as well.  Requests without
+    credentials are sent authenticated right away instead of being answered
+    with a 401 first; once the nonce has expired the 401 is passed on and
+    pyasic logs in again.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        max_idle: int = TRANSPORT_MAX_IDLE,
+        idle_timeout: float = TRANSPORT_IDLE_TIMEOUT,
+    ) -> None:
+        """Initialize the pool."""
+        self.host = host
+        self._transport = httpx.AsyncHTTPTransport(
+            verify=settings.ssl_cxt,
+            limits=httpx.Limits(
+                max_connections=None,
+                max_keepalive_connections=max_idle,
+                keepalive_expiry=idle_timeout,
+            ),
+        )
+        self._credentials: tuple[str, str] | None = None
+        self._digest: httpx.DigestAuth | None = None
+        self.requests = 0
+        self.connections = 0
+        self.challenges = 0
+
+    @property
+    def reused(self) -> int:
+        """Return the number of requests sent on an open connection."""
+        return max(self.requests - self.connections, 0)
+
+    def set_credentials(self, username: str, password: str) -> None:
+        """Answer the digest challenges of the miner with these credentials."""
+        if (username, password) != self._credentials:
+            self._credentials = (username, password)
+            self._digest = httpx.DigestAuth(username, password)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, authenticated with the last digest challenge."""
+        if self._digest is None or "authorization" in request.headers:
+            return await self._async_send(request)
+
+        flow = self._digest.auth_flow(request)
+        response = await self._async_send(next(flow))
+        if response.status_code == 401:
+            self.challenges += 1
+            response.request = request
+            # Only keeps the new challenge, pyasic sends the retry itself
+            with suppress(StopIteration, httpx.ProtocolError):
+                flow.send(response)
+        return response
+
+    async def _async_send(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, counting the connections that had to be opened."""
+        self.requests += 1
+        trace = request.extensions.get("trace")
+
+        async def _trace(event: str, info: dict[str, Any]) -> None:
+            if event == "connection.connect_tcp.complete":
+                self.connections += 1
+            if trace is not None:
+                await trace(event, info)
+
+        request.extensions["trace"] = _trace
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Close all connections to the miner."""
+        await self._transport.aclose()
+
+    def stats(self) -> dict[str, int]:
+        """Return how often connections were reused."""
+        return {
+            "requests": self.requests,
+            "connections": self.connections,
+            "reused": self.reused,
+            "challenges": self.challenges,
+        }
+
+
+class _ClientTransport(httpx.AsyncBaseTransport):
+    """Transport of one pyasic client, the pool of the miner if it has one."""
+
+    def __init__(self, verify: Any) -> None:
+        """Initialize the transport."""
+        self._verify = verify
+        self._own: httpx.AsyncBaseTransport | None = None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request through the pool of the miner it is sent to."""
+        if (transport := _transports.get(request.url.host)) is not None:
+            return await transport.handle_async_request(request)
+        if self._own is None:
+            self._own = _default_transport(self._verify)
+        return await self._own.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Close the connections of this client, the shared pools stay open."""
+        if self._own is not None:
+            await self._own.aclose()
+
+
+def token_expired(token: str | None) -> bool:
+    """Return if a JWT web token expires soon, other tokens never expire."""
+    if not isinstance(token, str) or token.count(".") != 2:
+        return False
+    payload = token.split(".")[1]
+    try:
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        return claims["exp"] - TOKEN_EXPIRY_MARGIN < time.time()
+    except (ValueError, TypeError, KeyError):
+        return False
+
+
+def _shared_transport(verify: Any = settings.ssl_cxt) -> httpx.AsyncBaseTransport:
+    """Return the transport for a new pyasic HTTP client."""
+    if verify is not settings.ssl_cxt:
+        return _default_transport(verify)
+    return _ClientTransport(verify)
+
+
+def async_register_transport(
+    transport: MinerTransport,
+) -> Callable[[], Awaitable[None]]:
+    """Send the web commands to a miner through its pool until unregistered.
+
+    The pyasic transport setting is restored once the last pool is gone.
+    """
+    settings.transport = _shared_transport
+    _transports[transport.host] = transport
+    _registered.add(transport)
+
+    async def _async_unregister() -> None:
+        _registered.discard(transport)
+        if _transports.get(transport.host) is transport:
+            del _transports[transport.host]
+        if not _registered:
+            settings.transport = _default_transport
+        _LOGGER.debug(
+            "Closing the connections to %s: %s", transport.host, transport.stats()
+        )
+        await transport.aclose()
+
+    return _async_unregister
@@ -0,0 +1,258 @@
+"""Benchmark MinerCoordinator refreshes against the miner simulator.
+
+Starts the simulator in its own process, then for every fleet size runs a
+fresh benchmark process that creates one coordinator per simulated miner and
+refreshes all of them for a number of rounds::
+
+    python -m scripts.benchmark_coordinator --output benchmark.json
+
+Reported per fleet size: refresh latency percentiles, event loop lag, CPU
+time per refresh, entity state writes per second and peak RSS.  Pass
+``--baseline`` with a previous report to print the change of the key numbers.
+Entities are represented by coordinator listeners with the same contexts the sensor
+platform uses, so the write count reflects the listener filtering but not the
+cost of the state machine itself.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from types import MappingProxyType
+
+SIMULATOR_BASE_IP = "127.1.0.1"
+LAG_PROBE_INTERVAL = 0.01
+
+
+def _percentiles(values: list[float]) -> dict:
+    """Return p50/p95/p99/max of a list of seconds in milliseconds."""
+    if len(values) < 2:
+        values = values * 2 or [0.0, 0.0]
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49] * 1000, 3),
+        "p95": round(cuts[94] * 1000, 3),
+        "p99": round(cuts[98] * 1000, 3),
+        "max": round(max(values) * 1000, 3),
+    }
+
+
+async def _monitor_loop_lag(samples: list[float]) -> None:
+    """Record how late the event loop wakes up a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        samples.append(max(loop.time() - start - LAG_PROBE_INTERVAL, 0))
+
+
+async def _run(count: int, rounds: int, base_ip: str) -> dict:
+    """Benchmark a fleet of coordinators and return the measurements."""
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+    from homeassistant.core import callback
+
+    from custom_components.miner.const import CONF_IP
+    from custom_components.miner.const import DOMAIN
+    from custom_components.miner.coordinator import MinerCoordinator
+    from custom_components.miner.coordinator import snapshot_values
+
+    hass = HomeAssistant(tempfile.mkdtemp())
+    first_ip = ipaddress.ip_address(base_ip)
+    coordinators = []
+    for idx in range(count):
+        entry = ConfigEntry(
+            data={CONF_IP: str(first_ip + idx)},
+            discovery_keys=MappingProxyType({}),
+            domain=DOMAIN,
+            minor_version=1,
+            options={},
+            source="user",
+            title=f"Miner {idx}",
+            unique_id=None,
+            version=1,
+        )
+        coordinators.append(MinerCoordinator(hass, entry))
+
+    # warm up: detect the miners and fetch identity and config once
+    await asyncio.gather(*(c.async_refresh() for c in coordinators))
+
+    writes = 0
+
+    @callback
+    def _entity_write() -> None:
+        nonlocal writes
+        writes += 1
+
+    for coordinator in coordinators:
+        if coordinator.data is None:
+            continue
+        for context in snapshot_values(coordinator.data):
+            coordinator.async_add_listener(_entity_write, context)
+
+    latencies: list[float] = []
+    lag: list[float] = []
+
+    async def _timed_refresh(coordinator: MinerCoordinator) -> None:
+        start = time.perf_counter()
+        await coordinator.async_refresh()
+        latencies.append(time.perf_counter() - start)
+
+    monitor = asyncio.create_task(_monitor_loop_lag(lag))
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for _ in range(rounds):
+        await asyncio.gather(*(_timed_refresh(c) for c in coordinators))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    monitor.cancel()
+
+    refreshes = len(latencies)
+    return {
+        "miners": count,
+        "rounds": rounds,
+        "refreshes": refreshes,
+        "failed": sum(not c.last_update_success for c in coordinators),
+        "duration_s": round(wall, 3),
+        "refresh_latency_ms": _percentiles(latencies),
+        "event_loop_lag_ms": _percentiles(lag),
+        "cpu_per_refresh_ms": round(cpu / refreshes * 1000, 3),
+        "refreshes_per_s": round(refreshes / wall, 1),
+        "entity_writes": writes,
+        "entity_writes_per_s": round(writes / wall, 1),
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    }
+
+
+def _wait_for_simulator(ip: str, timeout: float = 60) -> None:
+    """Block until the last simulated miner accepts RPC connections."""
+
+    async def _probe() -> None:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                _, writer = await asyncio.open_connection(ip, 4028)
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.2)
+            else:
+                writer.close()
+                return
+
+    asyncio.run(_probe())
+
+
+def _compare(results: list[dict], baseline: dict) -> None:
+    """Print the change of the key numbers against a previous run."""
+    previous = {r["miners"]: r for r in baseline.get("results", [])}
+    for result in results:
+        old = previous.get(result["miners"])
+        if old is None:
+            continue
+        for key, new_value, old_value in (
+            (
+                "refresh p95",
+                result["refresh_latency_ms"]["p95"],
+                old["refresh_latency_ms"]["p95"],
+            ),
+            (
+                "loop lag p99",
+                result["event_loop_lag_ms"]["p99"],
+                old["event_loop_lag_ms"]["p99"],
+            ),
+            ("cpu/refresh", result["cpu_per_refresh_ms"], old["cpu_per_refresh_ms"]),
+            ("peak rss", result["peak_rss_mb"], old["peak_rss_mb"]),
+        ):
+            change = (new_value - old_value) / old_value * 100 if old_value else 0
+            sys.stderr.write(
+                f"{result['miners']:>4} miners {key:<13} "
+                f"{old_value:>10.2f} -> {new_value:>10.2f} ({change:+.1f}%)\n"
+            )
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--miners", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="seconds")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a previous JSON file")
+    parser.add_argument("--run", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the benchmark for every fleet size."""
+    args = _parse_args()
+    if args.run is not None:
+        result = asyncio.run(_run(args.run, args.rounds, SIMULATOR_BASE_IP))
+        sys.stdout.write(json.dumps(result) + "\n")
+        return
+
+    count = max(args.miners)
+    simulator = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "scripts.simulator",
+            f"--count={count}",
+            f"--base-ip={SIMULATOR_BASE_IP}",
+            f"--latency={args.latency}",
+            f"--jitter={args.jitter}",
+        ],
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_for_simulator(str(ipaddress.ip_address(SIMULATOR_BASE_IP) + count - 1))
+        results = []
+        for miners in args.miners:
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "scripts.benchmark_coordinator",
+                    f"--run={miners}",
+                    f"--rounds={args.rounds}",
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            results.append(json.loads(output.splitlines()[-1]))
+            sys.stderr.write(json.dumps(results[-1]) + "\n")
+    finally:
+        simulator.terminate()
+        simulator.wait()
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "results": results,
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            _compare(results, json.load(file))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    else:
+        sys.stdout.write(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Measure the import time of the integration.
+
+Imports the integration package, which Home Assistant loads at startup even
+without config entries, in a fresh interpreter with ``-X importtime`` and
+checks it against a budget::
+
+    python -m scripts.benchmark_import --budget-ms 250 --output import.json
+
+The import of the modules only needed once a config entry is set up is
+reported as well, but does not count against the budget.  Exits with status 1
+if the budget is exceeded or if the package import pulls in pyasic.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PACKAGE = "custom_components.miner"
+MARKER = "-- measured imports --"
+RUNTIME_MODULES = (f"{PACKAGE}.coordinator", f"{PACKAGE}.sensor")
+
+# Import the dependencies Home Assistant has loaded before the integration, so
+# only the cost of the integration itself is measured
+PRELOAD = """
+import homeassistant.config_entries
+import homeassistant.helpers.config_validation
+import homeassistant.helpers.update_coordinator
+import homeassistant.components.network
+"""
+
+
+def _measure(modules: tuple[str, ...], preload: tuple[str, ...] = ()) -> dict:
+    """Import modules in a fresh interpreter and return the import times."""
+    code = PRELOAD + "".join(f"import {module}\n" for module in preload)
+    code += f"import sys\nsys.stderr.write('{MARKER}\\n')\n"
+    code += "".join(f"import {module}\n" for module in modules)
+    code += "print('pyasic' in sys.modules)\n"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    # lines look like "import time:   self [us] |  cumulative | imported package"
+    modules_us: dict[str, tuple[int, int]] = {}
+    measured = result.stderr.partition(MARKER)[2]
+    for line in measured.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        modules_us[name.strip()] = (int(self_us), int(cumulative_us))
+
+    total_us = sum(modules_us[module][1] for module in modules if module in modules_us)
+    slowest = sorted(modules_us.items(), key=lambda item: item[1][0], reverse=True)
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "pyasic_loaded": result.stdout.strip().splitlines()[-1] == "True",
+        "slowest_ms": {name: round(us[0] / 1000, 1) for name, us in slowest[:10]},
+    }
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=250)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    return parser.parse_args()
+
+
+def main() -> int:
+    """Run the benchmark and return the exit status."""
+    args = _parse_args()
+    package_runs = [_measure((PACKAGE,)) for _ in range(args.runs)]
+    runtime_runs = [
+        _measure(RUNTIME_MODULES, preload=(PACKAGE,)) for _ in range(args.runs)
+    ]
+
+    package_ms = statistics.median(run["total_ms"] for run in package_runs)
+    report = {
+        "budget_ms": args.budget_ms,
+        "package_ms": package_ms,
+        "package_loads_pyasic": any(run["pyasic_loaded"] for run in package_runs),
+        "package_slowest_ms": package_runs[-1]["slowest_ms"],
+        "runtime_ms": statistics.median(run["total_ms"] for run in runtime_runs),
+        "runtime_slowest_ms": runtime_runs[-1]["slowest_ms"],
+    }
+    report["within_budget"] = (
+        package_ms <= args.budget_ms and not report["package_loads_pyasic"]
+    )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    return 0 if report["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
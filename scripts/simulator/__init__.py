@@ -0,0 +1,21 @@
+"""Offline simulator of pyasic compatible miners for local load testing.
+
+Start a fleet of virtual miners and point config entries, the coordinator or
+the services at their loopback addresses::
+
+    python -m scripts.simulator --count 200 --latency 0.1 --dropout 0.01
+
+or from code::
+
+    async with MinerSimulator(count=100) as simulator:
+        ...
+
+The ``antminer`` firmware emulates stock Antminer firmware completely.  The
+``bosminer`` firmware only answers the RPC and LuCI web APIs; pyasic reads
+the hostname and config of Braiins OS miners over SSH, which is not emulated.
+"""
+from .miner import FIRMWARES
+from .miner import SimulatedMiner
+from .server import MinerSimulator
+
+__all__ = ["FIRMWARES", "MinerSimulator", "SimulatedMiner"]
@@ -0,0 +1,56 @@
+"""Run the miner simulator from the command line."""
+import argparse
+import asyncio
+import contextlib
+import logging
+
+from .miner import FIRMWARES
+from .server import MinerSimulator
+from .server import RPC_PORT
+from .server import WEB_PORT
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10, help="number of miners")
+    parser.add_argument("--base-ip", default="127.1.0.1", help="first miner IP")
+    parser.add_argument("--firmware", choices=FIRMWARES, default=FIRMWARES[0])
+    parser.add_argument("--boards", type=int, default=3)
+    parser.add_argument("--fans", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="seconds")
+    parser.add_argument(
+        "--dropout", type=float, default=0.0, help="share of requests dropped"
+    )
+    parser.add_argument("--rpc-port", type=int, default=RPC_PORT)
+    parser.add_argument("--web-port", type=int, default=WEB_PORT)
+    parser.add_argument("--no-web", action="store_true", help="only serve the RPC")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    """Serve the simulated miners until interrupted."""
+    args = _parse_args()
+    simulator = MinerSimulator(
+        count=args.count,
+        base_ip=args.base_ip,
+        firmware=args.firmware,
+        boards=args.boards,
+        fans=args.fans,
+        latency=args.latency,
+        jitter=args.jitter,
+        dropout=args.dropout,
+        rpc_port=args.rpc_port,
+        web_port=None if args.no_web else args.web_port,
+    )
+    async with simulator:
+        ips = list(simulator.miners)
+        logging.info("Miners listening on %s - %s", ips[0], ips[-1])
+        await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(main())
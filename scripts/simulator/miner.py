@@ -0,0 +1,371 @@
+"""State and API payloads of a single simulated miner."""
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+from dataclasses import field
+
+FIRMWARE_ANTMINER = "antminer"
+FIRMWARE_BOSMINER = "bosminer"
+FIRMWARES = (FIRMWARE_ANTMINER, FIRMWARE_BOSMINER)
+
+# bitmain-work-mode values of the stock Antminer web config
+WORK_MODE_NORMAL = 0
+WORK_MODE_SLEEP = 1
+WORK_MODE_LOW = 3
+
+
+def _noise(value: float, spread: float = 0.02) -> float:
+    """Return a value with some random measurement noise."""
+    return value * random.uniform(1 - spread, 1 + spread)
+
+
+def _status(msg: str, description: str) -> list[dict]:
+    """Return the STATUS section of a cgminer style RPC response."""
+    return [
+        {
+            "STATUS": "S",
+            "When": int(time.time()),
+            "Code": 11,
+            "Msg": msg,
+            "Description": description,
+        }
+    ]
+
+
+@dataclass
+class SimulatedMiner:
+    """A virtual miner answering the RPC and web APIs used by pyasic."""
+
+    ip: str
+    firmware: str = FIRMWARE_ANTMINER
+    model: str = "S19j Pro"
+    boards: int = 3
+    fans: int = 4
+    chips: int = 126
+    hashrate: float = 104.0
+    power_limit: int = 3250
+    work_mode: int = WORK_MODE_NORMAL
+    light: bool = False
+    offline: bool = False
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def hostname(self) -> str:
+        """Return the hostname of the miner."""
+        return f"sim-{self.ip.replace('.', '-')}"
+
+    @property
+    def mac(self) -> str:
+        """Return a MAC address derived from the IP."""
+        octets = [int(o) for o in self.ip.split(".")]
+        return "02:00:" + ":".join(f"{o:02X}" for o in octets)
+
+    @property
+    def is_mining(self) -> bool:
+        """Return if the miner is hashing."""
+        return self.work_mode != WORK_MODE_SLEEP
+
+    @property
+    def uptime(self) -> int:
+        """Return the number of seconds since the miner started."""
+        return int(time.monotonic() - self.started)
+
+    @property
+    def current_hashrate(self) -> float:
+        """Return the current hashrate in TH/s."""
+        if not self.is_mining:
+            return 0.0
+        if self.work_mode == WORK_MODE_LOW:
+            return _noise(self.hashrate * 0.7)
+        return _noise(self.hashrate)
+
+    @property
+    def wattage(self) -> int:
+        """Return the current power consumption in W."""
+        if not self.is_mining:
+            return 15
+        return int(_noise(self.power_limit * 0.97, 0.01))
+
+    def board_hashrates(self) -> list[float]:
+        """Return the hashrate of every board in GH/s."""
+        total = self.current_hashrate * 1000
+        return [round(_noise(total / self.boards), 2) for _ in range(self.boards)]
+
+    def fan_speeds(self) -> list[int]:
+        """Return the speed of every fan in RPM."""
+        if not self.is_mining:
+            return [0] * self.fans
+        return [int(_noise(5400, 0.03)) for _ in range(self.fans)]
+
+    def temperatures(self) -> list[tuple[float, float]]:
+        """Return the board and chip temperature of every board."""
+        if not self.is_mining:
+            return [(25.0, 25.0)] * self.boards
+        return [
+            (round(_noise(62, 0.03), 1), round(_noise(75, 0.03), 1))
+            for _ in range(self.boards)
+        ]
+
+    def rpc(self, command: str, request: dict) -> dict | None:
+        """Return the RPC response to a single command."""
+        handler = getattr(self, f"_rpc_{self.firmware}_{command}", None)
+        if handler is None:
+            return None
+        return handler(request)
+
+    def web(self, method: str, path: str, body: dict) -> tuple[int, dict | list | str]:
+        """Return the status and body of a web API request."""
+        handler = getattr(self, f"_web_{self.firmware}", None)
+        return handler(method, path, body)
+
+    # Stock Antminer (bmminer RPC and cgi-bin web API)
+
+    def _rpc_antminer_version(self, request: dict) -> dict:
+        return {
+            "STATUS": _status("BMMiner versions", "bmminer 1.0.0"),
+            "VERSION": [
+                {
+                    "BMMiner": "1.0.0",
+                    "API": "3.1",
+                    "Miner": "uart_trans.1.3",
+                    "CompileTime": "Mon Nov 20 11:05:43 CST 2023",
+                    "Type": f"Antminer {self.model}",
+                }
+            ],
+        }
+
+    def _rpc_antminer_summary(self, request: dict) -> dict:
+        hashrate = self.current_hashrate * 1000
+        return {
+            "STATUS": _status("Summary", "bmminer 1.0.0"),
+            "SUMMARY": [
+                {
+                    "Elapsed": self.uptime,
+                    "GHS 5s": round(hashrate, 2),
+                    "GHS av": round(hashrate, 2),
+                    "Accepted": self.uptime // 10,
+                    "Rejected": 0,
+                }
+            ],
+        }
+
+    def _rpc_antminer_stats(self, request: dict) -> dict:
+        temperatures = self.temperatures()
+        board_hashrates = self.board_hashrates()
+        if request.get("new_api"):
+            return {
+                "STATUS": _status("stats", "bmminer 1.0.0"),
+                "STATS": [
+                    {
+                        "elapsed": self.uptime,
+                        "chain": [
+                            {
+                                "index": idx,
+                                "rate_real": board_hashrates[idx],
+                                "asic_num": self.chips,
+                                "temp_pcb": [temperatures[idx][0]] * 4,
+                                "temp_chip": [temperatures[idx][1]] * 4,
+                                "sn": f"SIM{self.mac.replace(':', '')}{idx}",
+                            }
+                            for idx in range(self.boards)
+                        ],
+                        "fan": self.fan_speeds(),
+                    }
+                ],
+            }
+
+        stats = {
+            "Elapsed": self.uptime,
+            "total_rateideal": self.hashrate * 1000,
+            "rate_unit": "GH",
+            "fan_num": self.fans,
+            "miner_count": self.boards,
+        }
+        for idx, speed in enumerate(self.fan_speeds(), start=1):
+            stats[f"fan{idx}"] = speed
+        for idx in range(self.boards):
+            stats[f"chain_rate{idx + 1}"] = board_hashrates[idx]
+            stats[f"chain_acn{idx + 1}"] = self.chips
+            stats[f"temp{idx + 1}"] = temperatures[idx][0]
+            stats[f"temp2_{idx + 1}"] = temperatures[idx][1]
+        return {
+            "STATUS": _status("CGMiner stats", "bmminer 1.0.0"),
+            "STATS": [
+                {"BMMiner": "1.0.0", "Type": f"Antminer {self.model}"},
+                stats,
+            ],
+        }
+
+    def _rpc_antminer_pools(self, request: dict) -> dict:
+        return {
+            "STATUS": _status("1 Pool(s)", "bmminer 1.0.0"),
+            "POOLS": [
+                {
+                    "POOL": 0,
+                    "URL": "stratum+tcp://pool.example.com:3333",
+                    "User": "simulator",
+                    "Status": "Alive",
+                    "Stratum Active": True,
+                    "Accepted": self.uptime // 10,
+                    "Rejected": 0,
+                    "Get Failures": 0,
+                    "Remote Failures": 0,
+                }
+            ],
+        }
+
+    def _miner_conf(self) -> dict:
+        return {
+            "pools": [
+                {
+                    "url": "stratum+tcp://pool.example.com:3333",
+                    "user": "simulator",
+                    "pass": "x",
+                }
+            ],
+            "bitmain-fan-ctrl": False,
+            "bitmain-fan-pwm": "100",
+            "freq-level": "100",
+            "bitmain-work-mode": str(self.work_mode),
+        }
+
+    def _web_antminer(self, method: str, path: str, body: dict) -> tuple[int, dict]:
+        if path in ("", "/"):
+            return 401, {}
+        command = path.removeprefix("/cgi-bin/").removesuffix(".cgi")
+        if command == "get_system_info":
+            return 200, {
+                "minertype": f"Antminer {self.model}",
+                "hostname": self.hostname,
+                "macaddr": self.mac,
+                "ipaddress": self.ip,
+                "system_filesystem_version": "Mon Nov 20 11:05:43 CST 2023",
+            }
+        if command == "get_miner_conf":
+            return 200, self._miner_conf()
+        if command == "set_miner_conf":
+            # pyasic sends the mode as "miner-mode", the config reads it back
+            # as "bitmain-work-mode"
+            mode = body.get("miner-mode", body.get("bitmain-work-mode"))
+            if mode is not None:
+                self.work_mode = int(mode or WORK_MODE_NORMAL)
+            return 200, {"stats": "success", "code": "M000", "msg": "OK!"}
+        if command == "summary":
+            return 200, {"SUMMARY": [{"status": []}]}
+        if command == "get_blink_status":
+            return 200, {"blink": self.light}
+        if command == "blink":
+            self.light = bool(body.get("blink"))
+            return 200, {"code": "B000" if self.light else "B100"}
+        if command == "reboot":
+            self.started = time.monotonic()
+            return 200, {"code": "R000"}
+        return 404, {}
+
+    # Braiins OS (BOSminer RPC and LuCI web API)
+
+    def _rpc_bosminer_version(self, request: dict) -> dict:
+        return {
+            "STATUS": _status("BOSminer versions", "BOSminer 0.2.0"),
+            "VERSION": [{"BOSminer": "0.2.0", "API": "3.7"}],
+        }
+
+    def _rpc_bosminer_summary(self, request: dict) -> dict:
+        return {
+            "STATUS": _status("Summary", "BOSminer 0.2.0"),
+            "SUMMARY": [
+                {
+                    "Elapsed": self.uptime,
+                    "MHS 1m": round(self.current_hashrate * 1e6, 2),
+                }
+            ],
+        }
+
+    def _rpc_bosminer_devs(self, request: dict) -> dict:
+        return {
+            "STATUS": _status("Devs", "BOSminer 0.2.0"),
+            "DEVS": [
+                {
+                    "ID": idx + 1,
+                    "MHS 1m": hashrate * 1000,
+                    "Nominal MHS": self.hashrate * 1e6 / self.boards,
+                }
+                for idx, hashrate in enumerate(self.board_hashrates())
+            ],
+        }
+
+    def _rpc_bosminer_devdetails(self, request: dict) -> dict:
+        return {
+            "STATUS": _status(
+                "Device Details" if self.is_mining else "Unavailable",
+                "BOSminer 0.2.0",
+            ),
+            "DEVDETAILS": [
+                {
+                    "ID": idx + 1,
+                    "Chips": self.chips,
+                    "Model": f"Bitmain Antminer {self.model}",
+                }
+                for idx in range(self.boards)
+            ],
+        }
+
+    def _rpc_bosminer_temps(self, request: dict) -> dict:
+        return {
+            "STATUS": _status("Temperatures", "BOSminer 0.2.0"),
+            "TEMPS": [
+                {"ID": idx + 1, "Board": board, "Chip": chip}
+                for idx, (board, chip) in enumerate(self.temperatures())
+            ],
+        }
+
+    def _rpc_bosminer_fans(self, request: dict) -> dict:
+        return {
+            "STATUS": _status("Fans", "BOSminer 0.2.0"),
+            "FANS": [
+                {"FAN": idx, "RPM": speed}
+                for idx, speed in enumerate(self.fan_speeds())
+            ],
+        }
+
+    def _rpc_bosminer_tunerstatus(self, request: dict) -> dict:
+        return {
+            "STATUS": _status("Tuner Status", "BOSminer 0.2.0"),
+            "TUNERSTATUS": [
+                {
+                    "PowerLimit": self.power_limit,
+                    "ApproximateMinerPowerConsumption": self.wattage,
+                    "TunerChainStatus": [
+                        {"HashchainIndex": idx + 6, "Status": "Stable"}
+                        for idx in range(self.boards)
+                    ],
+                }
+            ],
+        }
+
+    def _rpc_bosminer_pools(self, request: dict) -> dict:
+        return self._rpc_antminer_pools(request)
+
+    def _rpc_bosminer_pause(self, request: dict) -> dict:
+        self.work_mode = WORK_MODE_SLEEP
+        return {"STATUS": _status("Pause", "BOSminer 0.2.0"), "PAUSE": [{"OK": 1}]}
+
+    def _rpc_bosminer_resume(self, request: dict) -> dict:
+        self.work_mode = WORK_MODE_NORMAL
+        return {"STATUS": _status("Resume", "BOSminer 0.2.0"), "RESUME": [{"OK": 1}]}
+
+    def _web_bosminer(
+        self, method: str, path: str, body: dict
+    ) -> tuple[int, dict | list | str]:
+        if path in ("", "/"):
+            return 200, "<html><title>Braiins OS</title></html>"
+        command = path.removeprefix("/cgi-bin/luci").removeprefix("/")
+        if command == "":
+            return 200, {}
+        if command == "admin/network/iface_status/lan":
+            return 200, [{"macaddr": self.mac}]
+        if command == "bos/info":
+            return 200, {"version": "2022-09-13-0-11012d53-22.08-plus"}
+        return 404, {}
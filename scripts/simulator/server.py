@@ -0,0 +1,217 @@
+"""Network servers of the miner simulator."""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import json
+import logging
+import random
+from urllib.parse import urlsplit
+
+from .miner import FIRMWARE_ANTMINER
+from .miner import SimulatedMiner
+
+_LOGGER = logging.getLogger(__name__)
+
+RPC_PORT = 4028
+WEB_PORT = 80
+
+HTTP_REASONS = {200: "OK", 401: "Unauthorized", 404: "Not Found"}
+
+
+class MinerSimulator:
+    """Serve a fleet of simulated miners on loopback addresses.
+
+    Every miner gets its own address in 127.0.0.0/8, with the RPC API on port
+    4028 and the web API on port 80 like real hardware, so pyasic detects and
+    polls them unchanged.  Binding port 80 requires root or a lowered
+    ``net.ipv4.ip_unprivileged_port_start``.
+    """
+
+    def __init__(
+        self,
+        count: int = 1,
+        base_ip: str = "127.1.0.1",
+        firmware: str = FIRMWARE_ANTMINER,
+        boards: int = 3,
+        fans: int = 4,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        dropout: float = 0.0,
+        rpc_port: int = RPC_PORT,
+        web_port: int | None = WEB_PORT,
+    ) -> None:
+        """Initialize the simulator."""
+        first_ip = ipaddress.ip_address(base_ip)
+        self.miners: dict[str, SimulatedMiner] = {}
+        for idx in range(count):
+            ip = str(first_ip + idx)
+            self.miners[ip] = SimulatedMiner(
+                ip=ip, firmware=firmware, boards=boards, fans=fans
+            )
+        self.latency = latency
+        self.jitter = jitter
+        self.dropout = dropout
+        self.rpc_port = rpc_port
+        self.web_port = web_port
+        self.requests = 0
+        self.dropped = 0
+        self._servers: list[asyncio.Server] = []
+
+    async def __aenter__(self) -> MinerSimulator:
+        """Start the simulator."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Stop the simulator."""
+        await self.stop()
+
+    async def start(self) -> None:
+        """Start listening on the addresses of all miners."""
+        for ip, miner in self.miners.items():
+            self._servers.append(
+                await asyncio.start_server(
+                    lambda r, w, m=miner: self._handle_rpc(m, r, w), ip, self.rpc_port
+                )
+            )
+            if self.web_port is not None:
+                self._servers.append(
+                    await asyncio.start_server(
+                        lambda r, w, m=miner: self._handle_web(m, r, w),
+                        ip,
+                        self.web_port,
+                    )
+                )
+        _LOGGER.info("Simulating %s miners.", len(self.miners))
+
+    async def stop(self) -> None:
+        """Stop all servers."""
+        for server in self._servers:
+            server.close()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers.clear()
+
+    def set_offline(self, ip: str, offline: bool = True) -> None:
+        """Make a miner stop or start answering."""
+        self.miners[ip].offline = offline
+
+    async def _respond_delay(self, miner: SimulatedMiner) -> bool:
+        """Wait for the simulated latency, return False to drop the request."""
+        self.requests += 1
+        if miner.offline or random.random() < self.dropout:
+            self.dropped += 1
+            return False
+        await asyncio.sleep(max(random.gauss(self.latency, self.jitter), 0))
+        return True
+
+    async def _handle_rpc(
+        self,
+        miner: SimulatedMiner,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """Answer a cgminer style RPC request."""
+        try:
+            raw = await asyncio.wait_for(reader.read(4096), timeout=5)
+            if not await self._respond_delay(miner):
+                return
+            try:
+                request = json.loads(raw.decode())
+            except ValueError:
+                return
+            commands = str(request.get("command", "")).split("+")
+            if len(commands) == 1:
+                response = miner.rpc(commands[0], request)
+                if response is None:
+                    response = {
+                        "STATUS": [
+                            {"STATUS": "E", "Code": 14, "Msg": "Invalid command"}
+                        ]
+                    }
+            else:
+                response = {"id": 1}
+                for command in commands:
+                    data = miner.rpc(command, request)
+                    if data is not None:
+                        response[command] = [data]
+            writer.write(json.dumps(response).encode() + b"\x00")
+            await writer.drain()
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_web(
+        self,
+        miner: SimulatedMiner,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """Answer HTTP requests, keeping the connection open between them."""
+        try:
+            while await self._answer_web(miner, reader, writer):
+                pass
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            writer.close()
+
+    async def _answer_web(
+        self,
+        miner: SimulatedMiner,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> bool:
+        """Answer one HTTP request, return if the connection stays open."""
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+        if not request_line:
+            return False
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode().partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = b""
+        if length := int(headers.get("content-length", 0)):
+            body = await reader.readexactly(length)
+
+        if not await self._respond_delay(miner):
+            return False
+
+        method, target, _ = request_line.decode().split(" ", 2)
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            payload = {}
+        path = urlsplit(target).path
+        if miner.firmware == FIRMWARE_ANTMINER and "authorization" not in headers:
+            # stock firmware answers every unauthenticated request with a challenge
+            status, data = 401, {}
+        else:
+            status, data = miner.web(method, path, payload)
+        keep_alive = headers.get("connection", "").lower() != "close"
+
+        content = data if isinstance(data, str) else json.dumps(data)
+        content_type = "text/html" if isinstance(data, str) else "application/json"
+        extra_headers = ""
+        if status == 401:
+            extra_headers = (
+                'WWW-Authenticate: Digest realm="antMiner Configuration", '
+                f'nonce="{random.getrandbits(64):x}", qop="auth"\r\n'
+            )
+        encoded = content.encode()
+        writer.write(
+            (
+                f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(encoded)}\r\n"
+                f"{extra_headers}"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+            ).encode()
+            + encoded
+        )
+        await writer.drain()
+        return keep_alive
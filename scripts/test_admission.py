@@ -0,0 +1,70 @@
+"""Lightweight test for the prioritized admission of miner setups."""
+import asyncio
+
+from custom_components.miner.admission import PRIORITY_KNOWN
+from custom_components.miner.admission import PRIORITY_NEW
+from custom_components.miner.admission import SetupAdmission
+
+
+async def main():
+    """Queue setups behind a running one and check the admission order."""
+    admission = SetupAdmission(max_concurrent=1)
+    admitted = []
+    release = asyncio.Event()
+
+    async def setup(name, priority, hold=False):
+        async with admission.slot(priority):
+            admitted.append(name)
+            if hold:
+                await release.wait()
+
+    running = asyncio.create_task(setup("running", PRIORITY_NEW, True))
+    await asyncio.sleep(0)
+
+    # Known miners go first, then the setups in the order they arrived
+    tasks = [
+        asyncio.create_task(setup(name, priority))
+        for name, priority in (
+            ("new 1", PRIORITY_NEW),
+            ("gone", PRIORITY_NEW),
+            ("new 2", PRIORITY_NEW),
+            ("known", PRIORITY_KNOWN),
+        )
+    ]
+    await asyncio.sleep(0)
+    assert admission.waiting == 4
+    assert admission.peak_waiting == 4
+
+    # A setup given up while waiting does not take a slot
+    tasks[1].cancel()
+    await asyncio.sleep(0)
+    assert admission.waiting == 3
+
+    release.set()
+    await asyncio.gather(running, *tasks, return_exceptions=True)
+    assert admitted == ["running", "known", "new 1", "new 2"]
+    assert admission.admitted == 4
+    assert admission.waiting == 0
+
+    # A slot granted right before the cancellation is passed on
+    admitted.clear()
+    release.clear()
+    running = asyncio.create_task(setup("running", PRIORITY_NEW, True))
+    await asyncio.sleep(0)
+    late = asyncio.create_task(setup("late", PRIORITY_KNOWN))
+    next_up = asyncio.create_task(setup("next", PRIORITY_NEW))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.sleep(0)
+    late.cancel()
+    await asyncio.gather(running, late, next_up, return_exceptions=True)
+    assert late.cancelled()
+    assert admitted == ["running", "next"]
+
+    # The slot is free again afterwards
+    await asyncio.wait_for(setup("after", PRIORITY_NEW), 1)
+    assert admitted[-1] == "after"
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+"""Lightweight test for the circuit breaker of unreachable miners."""
+import time
+
+from custom_components.miner.coordinator import CircuitState
+from custom_components.miner.coordinator import MinerCircuitBreaker
+
+
+def main():
+    """Walk the breaker through closed, open, half-open and back."""
+    breaker = MinerCircuitBreaker(failure_threshold=3, base_backoff=0.2)
+    assert breaker.state is CircuitState.CLOSED
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    assert not breaker.allow_request()
+    assert 0 < breaker.retry_in <= 0.2
+
+    time.sleep(0.25)
+    assert breaker.allow_request()
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert breaker.retry_in == 0
+
+    # A failed probe opens the circuit again, with a longer backoff
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.trips == 2
+    assert breaker.retry_in > 0.1
+
+    time.sleep(0.45)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.failures == 0
+    assert breaker.trips == 0
+
+    # The backoff never exceeds its cap
+    capped = MinerCircuitBreaker(failure_threshold=1, base_backoff=1, max_backoff=2)
+    for _ in range(20):
+        capped.record_failure()
+    assert capped.retry_in <= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Lightweight test for the serialized command queue of a miner."""
+import asyncio
+
+from custom_components.miner.commands import MinerCommandQueue
+
+
+async def main():
+    """Queue commands while another one runs and check what gets sent."""
+    sent = []
+    drained = []
+
+    async def on_drained():
+        drained.append(list(sent))
+
+    queue = MinerCommandQueue(on_drained)
+    release = asyncio.Event()
+
+    def command(name, wait=False):
+        async def _run():
+            if wait:
+                await release.wait()
+            sent.append(name)
+            return name
+
+        return _run
+
+    running = asyncio.create_task(queue.async_run("reboot", command("reboot", True)))
+    await asyncio.sleep(0)
+    assert queue.busy
+
+    # Queued behind the reboot, the newer power limit replaces the older one
+    first = asyncio.create_task(queue.async_run("power_limit", command("limit 1")))
+    second = asyncio.create_task(queue.async_run("power_limit", command("limit 2")))
+    mode = asyncio.create_task(queue.async_run("mining_mode", command("mode")))
+    await asyncio.sleep(0)
+    assert queue.merged == 1
+
+    release.set()
+    assert await running == "reboot"
+    assert await first == "limit 2"
+    assert await second == "limit 2"
+    assert await mode == "mode"
+    await queue.async_join()
+    assert sent == ["reboot", "limit 2", "mode"]
+    assert queue.executed == 3
+    assert drained == [sent]
+    assert not queue.busy
+
+    # A caller giving up does not cancel the command of the others
+    release.clear()
+    blocked = asyncio.create_task(queue.async_run("mining", command("pause", True)))
+    await asyncio.sleep(0)
+    impatient = asyncio.create_task(queue.async_run("reboot", command("reboot 2")))
+    patient = asyncio.create_task(queue.async_run("reboot", command("reboot 2")))
+    await asyncio.sleep(0)
+    impatient.cancel()
+    release.set()
+    assert await patient == "reboot 2"
+    assert await blocked == "pause"
+    assert impatient.cancelled()
+
+    # Errors are raised to the callers and the queue keeps working
+    async def _fail():
+        raise ValueError("rejected")
+
+    try:
+        await queue.async_run("power_limit", _fail)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Expected the command error to be raised")
+    assert await queue.async_run("power_limit", command("limit 3")) == "limit 3"
+
+    # Shutting down cancels the running and the waiting callers
+    release.clear()
+    hung = asyncio.create_task(queue.async_run("mining", command("resume", True)))
+    waiting = asyncio.create_task(queue.async_run("reboot", command("reboot 3")))
+    await asyncio.sleep(0)
+    await queue.async_shutdown()
+    await asyncio.sleep(0)
+    assert hung.cancelled()
+    assert waiting.cancelled()
+    assert not queue.busy
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""Lightweight test for a miner that stops answering between polls."""
+import asyncio
+import contextlib
+import tempfile
+from types import MappingProxyType
+
+import pyasic
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.miner.const import CONF_IP
+from custom_components.miner.const import DOMAIN
+from custom_components.miner.coordinator import CircuitState
+from custom_components.miner.coordinator import MinerCoordinator
+from scripts.simulator import MinerSimulator
+
+IP = "127.1.3.1"
+
+
+async def main():
+    """Poll a simulated miner, then take it offline and poll again."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        entry = ConfigEntry(
+            data={CONF_IP: IP},
+            discovery_keys=MappingProxyType({}),
+            domain=DOMAIN,
+            minor_version=1,
+            options={},
+            source="user",
+            title="Offline test",
+            unique_id=None,
+            version=1,
+        )
+        simulator = MinerSimulator(count=1, base_ip=IP, latency=0, jitter=0)
+        async with simulator:
+            miner = await pyasic.get_miner(IP)
+            coordinator = MinerCoordinator(hass, entry, miner)
+
+            data = await coordinator._async_update_data()
+            assert data.miner_sensors.hashrate > 0
+            assert coordinator.available
+            assert coordinator.breaker.failures == 0
+
+            simulator.set_offline(IP)
+            try:
+                await coordinator._async_update_data()
+            except UpdateFailed:
+                pass
+            else:
+                raise AssertionError("Expected an offline miner to fail the update")
+            assert coordinator.breaker.failures == 1
+            assert not coordinator.available
+
+            simulator.set_offline(IP, False)
+            await coordinator._async_update_data()
+            assert coordinator.available
+            assert coordinator.miner_detections == 2
+
+            simulator.set_offline(IP)
+            for _ in range(3):
+                with contextlib.suppress(UpdateFailed):
+                    await coordinator._async_update_data()
+            assert coordinator.breaker.state is CircuitState.OPEN
+
+        await hass.async_stop(force=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
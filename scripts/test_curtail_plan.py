@@ -0,0 +1,88 @@
+"""Lightweight test for planning a fleet curtailment."""
+from custom_components.miner.curtail import ACTION_KEEP
+from custom_components.miner.curtail import ACTION_PAUSE
+from custom_components.miner.curtail import ACTION_THROTTLE
+from custom_components.miner.curtail import MinerLoad
+from custom_components.miner.curtail import plan_curtailment
+
+
+def load(name, consumption, efficiency, can_throttle=True, can_pause=True):
+    """Return the power state of a miner with a minimum power of 1000W."""
+    return MinerLoad(
+        device_id=name,
+        name=name,
+        consumption=consumption,
+        min_power=1000,
+        efficiency=efficiency,
+        can_throttle=can_throttle,
+        can_pause=can_pause,
+    )
+
+
+def plan(miners, target, allow_pause=True):
+    """Return the planned action and power limit by miner name."""
+    return {
+        action.miner.name: (action.action, action.power_limit)
+        for action in plan_curtailment(miners, target, allow_pause)
+    }
+
+
+def main():
+    """Check the order and the kind of the planned actions."""
+    miners = [
+        load("efficient", 3000, 20),
+        load("wasteful", 3000, 35),
+        load("unknown", 3000, None),
+    ]
+
+    # Nothing to do below the target
+    assert plan(miners, 9000) == {
+        "efficient": (ACTION_KEEP, None),
+        "wasteful": (ACTION_KEEP, None),
+        "unknown": (ACTION_KEEP, None),
+    }
+
+    # The least efficient miner is throttled first, rounded down to 100W
+    assert plan(miners, 7750) == {
+        "wasteful": (ACTION_THROTTLE, 1700),
+        "efficient": (ACTION_KEEP, None),
+        "unknown": (ACTION_KEEP, None),
+    }
+
+    # Throttling continues with the next miner once one is at its minimum
+    assert plan(miners, 6000) == {
+        "wasteful": (ACTION_THROTTLE, 1000),
+        "efficient": (ACTION_THROTTLE, 2000),
+        "unknown": (ACTION_KEEP, None),
+    }
+
+    # Pausing only starts when every miner is throttled to its minimum
+    actions = plan_curtailment(miners, 2500)
+    assert [action.action for action in actions] == [
+        ACTION_PAUSE,
+        ACTION_THROTTLE,
+        ACTION_THROTTLE,
+    ]
+    assert sum(action.expected_consumption for action in actions) <= 2500
+
+    # Without pausing the plan stops at the minimum power of every miner
+    assert plan(miners, 2500, allow_pause=False) == {
+        "wasteful": (ACTION_THROTTLE, 1000),
+        "efficient": (ACTION_THROTTLE, 1000),
+        "unknown": (ACTION_THROTTLE, 1000),
+    }
+
+    # Miners that cannot be tuned are paused instead
+    fixed = [load("fixed", 3000, 30, can_throttle=False), load("tuned", 3000, 20)]
+    assert plan(fixed, 4500) == {
+        "fixed": (ACTION_KEEP, None),
+        "tuned": (ACTION_THROTTLE, 1500),
+    }
+    assert plan(fixed, 1000) == {
+        "fixed": (ACTION_PAUSE, None),
+        "tuned": (ACTION_THROTTLE, 1000),
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Lightweight test for polling a fleet of miners from a single loop."""
+import asyncio
+import tempfile
+from datetime import timedelta
+from types import SimpleNamespace
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.miner.fleet import FleetScheduler
+
+
+class FakeCoordinator:
+    """Coordinator counting its refreshes, optionally never finishing one."""
+
+    def __init__(self, name, hung=False, due=True):
+        """Initialize the coordinator."""
+        self.config_entry = SimpleNamespace(entry_id=name)
+        self.name = name
+        self.hung = hung
+        self.due = due
+        self.fleet_managed = False
+        self.update_interval = timedelta(seconds=10)
+        self.polls = 0
+        self.cancelled = False
+
+    def poll_due(self, slack):
+        """Return if the next poll is due."""
+        return self.due
+
+    async def async_refresh(self):
+        """Count the poll, a hung miner waits until cancelled."""
+        self.polls += 1
+        if self.hung:
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+
+
+async def main():
+    """Poll healthy miners next to a hung one."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        fleet = FleetScheduler(hass, timedelta(seconds=0.1), max_concurrent=2)
+        coordinators = [
+            FakeCoordinator("hung", hung=True),
+            FakeCoordinator("healthy 1"),
+            FakeCoordinator("healthy 2"),
+            FakeCoordinator("idle", due=False),
+        ]
+        unregister = [fleet.async_register(coordinator) for coordinator in coordinators]
+        assert all(coordinator.fleet_managed for coordinator in coordinators)
+        assert all(coordinator.update_interval is None for coordinator in coordinators)
+
+        await asyncio.sleep(0.55)
+
+        # The hung miner is skipped while the others keep their cadence, and
+        # the cycles without it finish on time
+        hung, healthy_1, healthy_2, idle = coordinators
+        assert hung.polls == 1
+        assert healthy_1.polls >= 4
+        assert healthy_2.polls >= 4
+        assert idle.polls == 0
+
+        stats = fleet.stats
+        assert stats["miners"] == 4
+        assert stats["cycles"] >= 5
+        assert stats["skipped_polls"] >= 4
+        assert stats["in_flight"] == 1
+        assert stats["last_cycle_duration"] < 0.1
+
+        # Unregistering the last miner stops the loop and its polls
+        for _unregister in unregister:
+            _unregister()
+        await asyncio.sleep(0)
+        assert hung.cancelled
+        cycles = fleet.cycles
+        await asyncio.sleep(0.25)
+        assert fleet.cycles == cycles
+        assert healthy_1.polls < 8
+
+        await hass.async_stop(force=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""Lightweight test for the rolling telemetry history of a miner."""
+from custom_components.miner.history import HASHRATE
+from custom_components.miner.history import MinerHistory
+from custom_components.miner.history import RingBuffer
+from custom_components.miner.history import TEMPERATURE
+from custom_components.miner.snapshot import BoardSensors
+from custom_components.miner.snapshot import MinerSensors
+from custom_components.miner.snapshot import MinerSnapshot
+from custom_components.miner.snapshot import PowerLimitRange
+
+BOARD_HASHRATE = ("board_sensors", 0, "board_hashrate")
+
+
+def snapshot(hashrate, temperature, boards=None):
+    """Return the data of a poll of a miner drawing 3000W."""
+    return MinerSnapshot(
+        power_limit_range=PowerLimitRange(min=15, max=10000),
+        miner_sensors=MinerSensors(
+            hashrate=hashrate,
+            temperature=temperature,
+            miner_consumption=3000,
+            efficiency=None,
+        ),
+        board_sensors=boards or {},
+    )
+
+
+def main():
+    """Check the ring buffer and the aggregates over a window."""
+    buffer = RingBuffer(4)
+    for value in range(1, 7):
+        buffer.append(value)
+    assert buffer.count == 4
+    assert list(buffer.newest(4)) == [3, 4, 5, 6]
+    assert list(buffer.newest(2)) == [5, 6]
+    assert list(buffer.newest(10)) == [3, 4, 5, 6]
+
+    times = RingBuffer(4, "d")
+    for value in (10, 20, 30, 40, 50):
+        times.append(value)
+    assert times.count_from(25) == 3
+    assert times.count_from(0) == 4
+    assert times.count_from(100) == 0
+
+    # The oldest poll is overwritten, a missing hashrate is skipped
+    history = MinerHistory(size=4)
+    polls = [(100, 60), (110, 70), (None, 80), (130, 90), (140, 50)]
+    for timestamp, (hashrate, temperature) in enumerate(polls):
+        history.record(snapshot(hashrate, temperature), timestamp=timestamp * 10)
+    assert history.samples() == 4
+    assert history.samples(window=15, now=40) == 2
+    assert history.values(HASHRATE) == [110, 130, 140]
+    assert history.aggregate(HASHRATE, "min") == 110
+    assert history.aggregate(HASHRATE, "max") == 140
+    assert history.aggregate(HASHRATE, "p50") == 130
+    assert history.aggregate(HASHRATE, "p95") == 140
+    assert abs(history.aggregate(HASHRATE, "mean") - 380 / 3) < 1e-9
+    assert history.aggregate(HASHRATE, "mean", window=15, now=40) == 135
+    assert history.aggregate(TEMPERATURE, "max", window=15, now=40) == 90
+    assert history.aggregate(HASHRATE, "mean", window=10, now=1000) is None
+    assert history.aggregate(("miner_sensors", "unknown"), "mean") is None
+
+    # Efficiency only counts the polls with both hashrate and consumption
+    assert abs(history.efficiency() - 9000 / 380) < 1e-9
+    assert abs(history.efficiency(window=15, now=40) - 6000 / 270) < 1e-9
+
+    # A board reported later starts with missing values for the earlier polls
+    boards = {0: BoardSensors(45, 60, 50)}
+    history.record(snapshot(150, 55, boards), timestamp=50)
+    assert history.values(BOARD_HASHRATE) == [50]
+    summary = history.summary(now=50)
+    assert summary["samples"] == 4
+    assert summary["series"]["board_0_hashrate"]["count"] == 1
+    assert summary["series"]["hashrate"] == {
+        "count": 3,
+        "mean": 140.0,
+        "min": 130.0,
+        "max": 150.0,
+        "p50": 140.0,
+        "p95": 150.0,
+    }
+    assert "efficiency" not in summary["series"]
+
+
+if __name__ == "__main__":
+    main()
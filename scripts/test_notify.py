@@ -0,0 +1,105 @@
+"""Lightweight test for updating only the entities whose data changed."""
+import asyncio
+import tempfile
+from dataclasses import replace
+from types import MappingProxyType
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.miner.const import CONF_FAN_DEADBAND
+from custom_components.miner.const import CONF_IP
+from custom_components.miner.const import CONF_TEMPERATURE_DEADBAND
+from custom_components.miner.const import DOMAIN
+from custom_components.miner.coordinator import MinerCoordinator
+from custom_components.miner.snapshot import BoardSensors
+from custom_components.miner.snapshot import FanSensors
+from custom_components.miner.snapshot import MinerSensors
+from custom_components.miner.snapshot import MinerSnapshot
+from custom_components.miner.snapshot import PowerLimitRange
+
+HASHRATE = ("miner_sensors", "hashrate")
+TEMPERATURE = ("miner_sensors", "temperature")
+FAN = ("fan_sensors", 0, "fan_speed")
+BOARD = ("board_sensors", 0, "board_hashrate")
+CONTEXTS = (None, HASHRATE, TEMPERATURE, FAN, BOARD, ("is_mining",))
+
+
+def with_sensors(data, **changes):
+    """Return a copy of the data with other miner sensor values."""
+    return replace(data, miner_sensors=replace(data.miner_sensors, **changes))
+
+
+async def main():
+    """Push changed data and check which listeners are called."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        entry = ConfigEntry(
+            data={CONF_IP: "127.1.3.2"},
+            discovery_keys=MappingProxyType({}),
+            domain=DOMAIN,
+            minor_version=1,
+            options={CONF_TEMPERATURE_DEADBAND: 2, CONF_FAN_DEADBAND: 100},
+            source="user",
+            title="Notify test",
+            unique_id=None,
+            version=1,
+        )
+        coordinator = MinerCoordinator(hass, entry)
+        notified = []
+        for context in CONTEXTS:
+            coordinator.async_add_listener(
+                lambda context=context: notified.append(context), context
+            )
+
+        def update(data):
+            notified.clear()
+            coordinator.async_set_updated_data(data)
+            return set(notified)
+
+        data = MinerSnapshot(
+            power_limit_range=PowerLimitRange(min=15, max=10000),
+            hostname="miner",
+            is_mining=True,
+            miner_sensors=MinerSensors(hashrate=100, temperature=60),
+            fan_sensors={0: FanSensors(fan_speed=3000)},
+        )
+        assert update(data) == set(CONTEXTS)
+        assert update(data) == {None}
+
+        data = with_sensors(data, hashrate=101)
+        assert update(data) == {None, HASHRATE}
+
+        # Small changes are held back until they add up to the deadband
+        data = with_sensors(data, temperature=61)
+        assert update(data) == {None}
+        data = with_sensors(data, temperature=62)
+        assert update(data) == {None, TEMPERATURE}
+        data = replace(data, fan_sensors={0: FanSensors(fan_speed=3050)})
+        assert update(data) == {None}
+        data = replace(data, fan_sensors={0: FanSensors(fan_speed=2900)})
+        assert update(data) == {None, FAN}
+
+        # A board showing up or going away is a change
+        data = replace(data, board_sensors={0: BoardSensors(45, 60, 50)})
+        assert update(data) == {None, BOARD}
+        data = replace(data, board_sensors={}, is_mining=False)
+        assert update(data) == {None, BOARD, ("is_mining",)}
+
+        # A change of the device data updates every entity
+        data = replace(data, hostname="renamed")
+        assert update(data) == set(CONTEXTS)
+
+        # So does a failed and the next successful update
+        notified.clear()
+        coordinator.async_set_update_error(UpdateFailed("No answer"))
+        assert set(notified) == set(CONTEXTS)
+        assert update(data) == set(CONTEXTS)
+
+        await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+"""Lightweight test for the adaptive poll interval of a miner."""
+from custom_components.miner.coordinator import AdaptivePollInterval
+from custom_components.miner.coordinator import CONTROL_BOOST_POLLS
+
+
+def main():
+    """Check the interval for each miner state."""
+    interval = AdaptivePollInterval(base=10, minimum=5, maximum=60)
+    assert interval.next_interval(True, 0) == 10
+    assert interval.next_interval(None, 0) == 10
+
+    # An idle miner is polled at the maximum interval
+    assert interval.next_interval(False, 0) == 60
+
+    # Failures back off exponentially up to the maximum
+    assert interval.next_interval(True, 1) == 20
+    assert interval.next_interval(True, 2) == 40
+    assert interval.next_interval(True, 5) == 60
+
+    # A control action polls at the minimum for a few polls
+    interval.boost()
+    for _ in range(CONTROL_BOOST_POLLS):
+        assert interval.next_interval(False, 3) == 5
+    assert interval.next_interval(True, 0) == 10
+
+    # Never faster than twice the average latency
+    interval.record_latency(4)
+    assert interval.latency == 4
+    interval.record_latency(14)
+    assert abs(interval.latency - 7) < 1e-9
+    assert interval.next_interval(True, 0) == 14
+    interval.boost()
+    assert interval.next_interval(True, 0) == 14
+
+    # The bounds always include the base interval
+    narrow = AdaptivePollInterval(base=30, minimum=60, maximum=20)
+    assert narrow.minimum == 30
+    assert narrow.maximum == 30
+    assert narrow.next_interval(False, 4) == 30
+
+
+if __name__ == "__main__":
+    main()
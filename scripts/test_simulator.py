@@ -0,0 +1,84 @@
+"""Lightweight test for the miner simulator RPC and web APIs."""
+import asyncio
+import json
+
+from scripts.simulator import MinerSimulator
+
+AUTHORIZATION = 'Authorization: Digest username="root"\r\n'
+
+
+async def rpc(ip: str, port: int, command: dict) -> dict:
+    """Send a single RPC command and return the parsed response."""
+    reader, writer = await asyncio.open_connection(ip, port)
+    writer.write(json.dumps(command).encode())
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    return json.loads(data.rstrip(b"\x00"))
+
+
+async def http_get(
+    ip: str, port: int, path: str, headers: str = ""
+) -> tuple[int, str, bytes]:
+    """Send a GET request and return the status, headers and body."""
+    reader, writer = await asyncio.open_connection(ip, port)
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: {ip}\r\n{headers}Connection: close\r\n\r\n".encode()
+    )
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    head, _, body = data.partition(b"\r\n\r\n")
+    return int(head.split()[1]), head.decode(), body
+
+
+async def main():
+    """Run a few assertions against two simulated miners."""
+    simulator = MinerSimulator(
+        count=2, latency=0, jitter=0, rpc_port=14028, web_port=18080
+    )
+    async with simulator:
+        ip = "127.1.0.2"
+
+        version = await rpc(ip, 14028, {"command": "version"})
+        assert version["VERSION"][0]["Type"] == "Antminer S19j Pro"
+
+        multi = await rpc(ip, 14028, {"command": "summary+stats"})
+        assert multi["summary"][0]["SUMMARY"][0]["GHS 5s"] > 0
+        assert multi["stats"][0]["STATS"][1]["fan1"] > 0
+
+        status, headers, _ = await http_get(ip, 18080, "/")
+        assert status == 401
+        assert 'realm="antMiner' in headers
+
+        status, _, _ = await http_get(ip, 18080, "/cgi-bin/get_system_info.cgi")
+        assert status == 401
+
+        status, _, body = await http_get(
+            ip, 18080, "/cgi-bin/get_system_info.cgi", AUTHORIZATION
+        )
+        assert status == 200
+        assert json.loads(body)["macaddr"] == simulator.miners[ip].mac
+
+        # keep-alive: two requests on the same connection
+        reader, writer = await asyncio.open_connection(ip, 18080)
+        for _ in range(2):
+            writer.write(
+                f"GET /cgi-bin/get_system_info.cgi HTTP/1.1\r\n{AUTHORIZATION}\r\n".encode()
+            )
+            assert (await reader.readline()).startswith(b"HTTP/1.1 200")
+            while (line := await reader.readline()) != b"\r\n":
+                if line.lower().startswith(b"content-length"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+        writer.close()
+
+        simulator.set_offline(ip)
+        reader, writer = await asyncio.open_connection(ip, 14028)
+        writer.write(b'{"command": "summary"}')
+        assert await reader.read() == b""
+        writer.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())